@@ -37,8 +37,36 @@ async function loadComponent(elementId, filePath) {
     }
 }
 
+let bootstrapPromise = null;
+
+/**
+ * Fetch /api/bootstrap once per page and share the result.
+ * The loader always needs identity and unread; a page can add its own sections
+ * with <body data-bootstrap="dashboard,..."> and read them from the same call.
+ * Resolves to the sections object, or null when logged out or on failure.
+ */
+function getBootstrap() {
+    if (!bootstrapPromise) {
+        const token = localStorage.getItem('auth_token');
+        const extra = (document.body && document.body.dataset.bootstrap) || '';
+        const include = ['identity', 'unread', ...extra.split(',').filter(Boolean)];
+
+        bootstrapPromise = !token ? Promise.resolve(null) : fetch(`http://127.0.0.1:5000/api/bootstrap?include=${include.join(',')}`, {
+            headers: {
+                'Authorization': `Bearer ${token}`
+            }
+        })
+            .then(response => response.ok ? response.json() : null)
+            .catch(error => {
+                console.error('Error fetching page bootstrap:', error);
+                return null;
+            });
+    }
+    return bootstrapPromise;
+}
+window.getBootstrap = getBootstrap;
+
 async function updateUserProfile() {
-    const token = localStorage.getItem('auth_token');
     const userStr = localStorage.getItem('user');
 
     // Initial attempt from localStorage for speed
@@ -52,40 +80,25 @@ async function updateUserProfile() {
         }
     }
 
-    // Always try to fetch fresh data if token exists to ensure consistency with dashboard.html
-    if (token) {
-        try {
-            const response = await fetch('http://127.0.0.1:5000/api/dashboard', {
-                headers: {
-                    'Authorization': `Bearer ${token}`
-                }
-            });
+    // Fresh identity from the shared bootstrap call; every component load reuses it
+    const data = await getBootstrap();
+    if (data && data.identity) {
+        const identity = data.identity;
+        applyProfileData(identity.name);
+        applyRoleData(identity.role);
 
-            if (response.ok) {
-                const data = await response.json();
-                if (data.user_name) {
-                    applyProfileData(data.user_name);
-
-                    // Update Points if available
-                    if (data.points !== undefined) {
-                        const navPoints = document.getElementById('navHeaderPoints');
-                        if (navPoints) navPoints.textContent = data.points;
-
-                        // Also try to update dashboard specific one if it exists and wasn't caught
-                        const dashboardPoints = document.getElementById('headerPoints');
-                        if (dashboardPoints) dashboardPoints.textContent = data.points;
-                    }
-
-                    // Sync back to localStorage if possible
-                    if (userStr) {
-                        const user = JSON.parse(userStr);
-                        user.name = data.user_name; // Use 'name' as standard for this script
-                        localStorage.setItem('user', JSON.stringify(user));
-                    }
-                }
-            }
-        } catch (error) {
-            console.error('Error fetching fresh profile data:', error);
+        const navPoints = document.getElementById('navHeaderPoints');
+        if (navPoints) navPoints.textContent = identity.points;
+
+        // Also try to update dashboard specific one if it exists and wasn't caught
+        const dashboardPoints = document.getElementById('headerPoints');
+        if (dashboardPoints) dashboardPoints.textContent = identity.points;
+
+        // Sync back to localStorage if possible
+        if (userStr) {
+            const user = JSON.parse(userStr);
+            user.name = identity.name; // Use 'name' as standard for this script
+            localStorage.setItem('user', JSON.stringify(user));
         }
     }
 }
@@ -186,6 +186,35 @@ document.addEventListener('DOMContentLoaded', function () {
     });
 
     // Unread Messages Indicator
+    function applyUnreadCount(count) {
+        const msgBtns = document.querySelectorAll('button[onclick*="student-messages.html"], button[onclick*="mentor-messages.html"]');
+
+        msgBtns.forEach(btn => {
+            // Check if dot already exists
+            let dot = btn.querySelector('.unread-dot');
+            if (count > 0) {
+                if (!dot) {
+                    dot = document.createElement('span');
+                    dot.className = 'unread-dot';
+                    dot.style.cssText = `
+                        position: absolute;
+                        top: 5px;
+                        right: 5px;
+                        width: 8px;
+                        height: 8px;
+                        background: #ff4d4f;
+                        border-radius: 50%;
+                        border: 2px solid var(--bg-card);
+                    `;
+                    btn.style.position = 'relative';
+                    btn.appendChild(dot);
+                }
+            } else if (dot) {
+                dot.remove();
+            }
+        });
+    }
+
     async function checkUnreadMessages() {
         const token = localStorage.getItem('auth_token');
         if (!token) return;
@@ -197,37 +226,67 @@ document.addEventListener('DOMContentLoaded', function () {
 
             if (res.ok) {
                 const data = await res.json();
-                const msgBtns = document.querySelectorAll('button[onclick*="student-messages.html"], button[onclick*="mentor-messages.html"]');
-
-                msgBtns.forEach(btn => {
-                    // Check if dot already exists
-                    let dot = btn.querySelector('.unread-dot');
-                    if (data.unread_count > 0) {
-                        if (!dot) {
-                            dot = document.createElement('span');
-                            dot.className = 'unread-dot';
-                            dot.style.cssText = `
-                                position: absolute;
-                                top: 5px;
-                                right: 5px;
-                                width: 8px;
-                                height: 8px;
-                                background: #ff4d4f;
-                                border-radius: 50%;
-                                border: 2px solid var(--bg-card);
-                            `;
-                            btn.style.position = 'relative';
-                            btn.appendChild(dot);
-                        }
-                    } else if (dot) {
-                        dot.remove();
-                    }
-                });
+                applyUnreadCount(data.unread_count);
             }
         } catch (e) { console.error("Unread check failed", e); }
     }
 
-    // Initial check and poll every 30s
-    checkUnreadMessages();
-    setInterval(checkUnreadMessages, 30000);
+    // Live updates over Server-Sent Events; the stream sends the current unread
+    // count on connect and then pushes new messages / mentorship updates.
+    // Pages can listen for 'ascend:message', 'ascend:mentorship_request' and
+    // 'ascend:open' (fired on every (re)connect, to resync anything missed).
+    const eventsToken = localStorage.getItem('auth_token');
+    if (eventsToken && window.EventSource) {
+        // EventSource cannot send headers, so the URL carries a short-lived
+        // stream token instead of the bearer token
+        let retryDelay = 3000;
+        async function connectEvents() {
+            let streamToken;
+            try {
+                const res = await fetch('http://127.0.0.1:5000/api/events/token', {
+                    method: 'POST',
+                    headers: { 'Authorization': `Bearer ${eventsToken}` }
+                });
+                if (!res.ok) return;
+                streamToken = (await res.json()).stream_token;
+            } catch (e) {
+                setTimeout(connectEvents, 5000);
+                return;
+            }
+            const events = new EventSource(`http://127.0.0.1:5000/api/events?stream_token=${encodeURIComponent(streamToken)}`);
+            events.addEventListener('open', () => {
+                retryDelay = 3000;
+                document.dispatchEvent(new CustomEvent('ascend:open'));
+            });
+            events.addEventListener('unread_count', e => applyUnreadCount(JSON.parse(e.data).unread_count));
+            ['message', 'mentorship_request'].forEach(type => {
+                events.addEventListener(type, e => {
+                    document.dispatchEvent(new CustomEvent(`ascend:${type}`, { detail: JSON.parse(e.data) }));
+                });
+            });
+            // EventSource retries with the same URL; once the stream token has
+            // expired that is refused and the source closes, so fetch a new one.
+            // The server also refuses streams when it has too many open (503):
+            // poll the unread count meanwhile and back off up to a minute
+            events.addEventListener('error', () => {
+                if (events.readyState !== EventSource.CLOSED) return;
+                checkUnreadMessages();
+                setTimeout(connectEvents, retryDelay);
+                retryDelay = Math.min(retryDelay * 2, 60000);
+            });
+            window.ascendEvents = events;
+        }
+        connectEvents();
+    } else {
+        // Fallback: initial count from the page bootstrap, then poll every 30s
+        if (window.getBootstrap) {
+            window.getBootstrap().then(data => {
+                if (data && data.unread) applyUnreadCount(data.unread.unread_count);
+                else checkUnreadMessages();
+            });
+        } else {
+            checkUnreadMessages();
+        }
+        setInterval(checkUnreadMessages, 30000);
+    }
 });
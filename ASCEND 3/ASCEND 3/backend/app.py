@@ -1,16 +1,40 @@
 from flask import Flask
 from config import Config
-from models import db, User
+from models import db, User, MentorStats
 from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_cors import CORS
+import sqlite_tuning
+import db_routing
+import identity
+import hashing
+import recommendations
+import leaderboard
+import question_queue
+import events
+import profiling
+import metrics
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
 # Initialize extensions
+sqlite_tuning.init_app(app) # Before db.init_app: sizes the engine's pool
+metrics.init_app(app) # Before db.init_app: times the engine's pool
 db.init_app(app)
-migrate = Migrate(app, db)
+db_routing.init_app(app)
+def _include_object(obj, name, type_, reflected, compare_to):
+    # The FTS5 search table and its shadow tables are managed by search.py
+    return not (type_ == 'table' and name.startswith('search_index'))
+
+migrate = Migrate(app, db, include_object=_include_object)
+identity.init_app(app)
+hashing.init_app(app)
+recommendations.init_app(app)
+leaderboard.init_app(app)
+question_queue.init_app(app)
+events.init_app(app)
+profiling.init_app(app)
 login = LoginManager(app)
 login.login_view = 'auth.login' 
 login.login_view = 'auth.login' 
@@ -21,10 +45,14 @@ CORS(app)
 def load_user_from_request(request):
     # Check for Authorization header
     auth_header = request.headers.get('Authorization')
+    # EventSource cannot send headers, so the event stream passes a short-lived
+    # ?stream_token= (POST /api/events/token) rather than the bearer token
+    if not auth_header and request.path == '/api/events':
+        return identity.load_stream_identity(request.args.get('stream_token', ''))
     if auth_header:
         try:
             auth_token = auth_header.replace("Bearer ", "")
-            user = User.verify_auth_token(auth_token)
+            user = identity.load_identity(auth_token)
             if user:
                 return user
         except Exception as e:
@@ -44,6 +72,33 @@ def index():
 def make_shell_context():
     return {'db': db, 'User': User}
 
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index():
+    """Repopulate the FTS5 search table from questions, replies, roadmaps and threads."""
+    from search import rebuild_index
+    print(f"Search index rebuilt ({rebuild_index()} documents).")
+
+@app.cli.command('rebuild-stats')
+def rebuild_stats():
+    """Compact the mentor, roadmap and thread rollups by recomputing them from source rows.
+
+    Safe to run periodically (e.g. nightly from cron) to correct any drift.
+    """
+    users = MentorStats.rebuild()
+    print(f"Stats rebuilt ({users} users with mentoring activity).")
+
+@app.cli.command('rebuild-points')
+def rebuild_points():
+    """Recompute every user's cached points balance from the points ledger."""
+    from points import rebuild_balances
+    print(f"Points balances rebuilt ({rebuild_balances()} users).")
+
+@app.cli.command('reconcile-unread')
+def reconcile_unread():
+    """Rebuild the materialized unread counters from the messages table."""
+    users = User.rebuild_unread_counts()
+    print(f"Unread counters rebuilt ({users} users with unread messages).")
+
 # Register Blueprints
 # Import here to avoid circular dependencies if routes import app
 from routes.auth import auth as auth_bp
@@ -0,0 +1,209 @@
+"""Repeatable API benchmark.
+
+Drives every GET endpoint of the API (and, with --writes, the main write
+paths) through the Flask test client as a rotating sample of users, and
+records p50/p95/p99 latency, SQL statements per request and peak Python
+memory per endpoint into a JSON report:
+
+    DATABASE_URL=sqlite:////tmp/load.db python benchmark.py --output before.json
+    DATABASE_URL=sqlite:////tmp/load.db python benchmark.py --compare before.json
+
+Latency and statement counts come from the timed iterations; peak memory is
+measured in one extra traced request per endpoint, so tracing does not skew
+the timings. With --compare, endpoints whose p95 latency or statement count
+grew by more than --threshold are reported and the exit status is 1.
+Populate the database with generate_load_data.py first; --writes changes it.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.append(os.getcwd())
+
+from sqlalchemy import event, func
+from app import app, db
+from models import User, Question, Roadmap, DiscussionThread, Conversation
+
+# Never benchmarked: an open-ended stream
+SKIP_ENDPOINTS = {'api.stream_events', 'static'}
+# Query strings for endpoints that need one
+QUERY_STRINGS = {
+    '/api/search': '?q=interview',
+    '/api/bootstrap': '?include=identity,unread,profile,dashboard',
+    '/api/leaderboard': '?around=5',
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--iterations', type=int, default=30, help='Timed requests per endpoint')
+    parser.add_argument('--users-per-role', type=int, default=10, help='Sample users rotated through per role')
+    parser.add_argument('--filter', default='', help='Only endpoints whose path contains this')
+    parser.add_argument('--writes', action='store_true', help='Also benchmark write endpoints (modifies the database)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the JSON report here')
+    parser.add_argument('--compare', help='Baseline JSON report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed relative growth before flagging')
+    return parser.parse_args()
+
+def percentile(values, p):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+def role_for(path):
+    if path.startswith('/api/mentor/'):
+        return 'mentor'
+    if path.startswith('/api/admin/'):
+        return 'admin'
+    return 'student'
+
+class Actor:
+    """A sample user: auth headers plus ids to fill URL parameters with."""
+    def __init__(self, user, rng, candidates):
+        self.id = user.id
+        self.headers = {'Authorization': f'Bearer {user.generate_auth_token()}'}
+        partner = db.session.query(Conversation.partner_id).filter_by(user_id=user.id).order_by(
+            Conversation.last_message_at.desc()).first()
+        self.params = {name: rng.choice(ids) if ids else 1 for name, ids in candidates.items()}
+        self.params['partner_id'] = partner[0] if partner else 1
+
+def sample_actors(args, rng):
+    candidates = {
+        'roadmap_id': [i for i, in db.session.query(Roadmap.id)],
+        'thread_id': [i for i, in db.session.query(DiscussionThread.id)],
+        'question_id': [i for i, in db.session.query(Question.id).order_by(Question.id.desc()).limit(1000)],
+    }
+    actors = {}
+    for role in ('student', 'mentor', 'admin'):
+        roles = ('mentor', 'alumni') if role == 'mentor' else (role,)
+        # Verified accounts only, so mentor write paths are not rejected
+        ids = [i for i, in db.session.query(User.id).filter(User.role.in_(roles), User.is_verified == True)]
+        chosen = rng.sample(ids, min(args.users_per_role, len(ids)))
+        actors[role] = [Actor(db.session.get(User, i), rng, candidates) for i in chosen]
+    return actors
+
+def get_scenarios(args):
+    """[(name, method, path template, role, json body or None)] for every benchmarked request."""
+    scenarios = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if rule.endpoint in SKIP_ENDPOINTS or 'GET' not in rule.methods:
+            continue
+        path = rule.rule.replace('<int:', '<')
+        path = path.replace('<', '{').replace('>', '}') + QUERY_STRINGS.get(rule.rule, '')
+        scenarios.append((f"GET {rule.rule}", 'GET', path, role_for(rule.rule), None))
+    if args.writes:
+        scenarios += [
+            ('POST /api/questions', 'POST', '/api/questions', 'student',
+             {'title': 'Benchmark question', 'content': 'How should I prepare?'}),
+            ('POST /api/questions/<id>/reply', 'POST', '/api/questions/{question_id}/reply', 'mentor',
+             {'content': 'Benchmark reply'}),
+            ('POST /api/messages', 'POST', '/api/messages', 'student', None),
+            ('POST /api/discussions/<id>/like', 'POST', '/api/discussions/{thread_id}/like', 'student', None),
+        ]
+    return [s for s in scenarios if args.filter in s[0]]
+
+def run(args):
+    rng = random.Random(args.seed)
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.append(1))
+        actors = sample_actors(args, rng)
+        database = {table.name: db.session.query(func.count()).select_from(table).scalar()
+                    for table in db.metadata.sorted_tables}
+    client = app.test_client()
+
+    def request(method, path, actor, body):
+        if path == '/api/messages' and body is None:
+            body = {'recipient_id': actor.params['partner_id'], 'content': 'Benchmark message'}
+        return client.open(path.format(**actor.params), method=method, headers=actor.headers, json=body)
+
+    results = {}
+    for name, method, path, role, body in get_scenarios(args):
+        pool = actors.get(role) or actors['student']
+        if not pool:
+            continue
+        request(method, path, pool[0], body).get_data() # Warm caches and lazy indexes
+        latencies, counts, errors = [], [], 0
+        for i in range(args.iterations):
+            actor = pool[i % len(pool)]
+            del statements[:]
+            began = time.perf_counter()
+            response = request(method, path, actor, body)
+            response.get_data()
+            latencies.append((time.perf_counter() - began) * 1000)
+            counts.append(len(statements))
+            errors += response.status_code >= 400
+
+        tracemalloc.start()
+        request(method, path, pool[0], body).get_data()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[name] = {
+            'role': role,
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(sum(latencies) / len(latencies), 3),
+            'queries_p50': percentile(counts, 50),
+            'queries_max': max(counts),
+            'peak_kb': round(peak / 1024, 1),
+            'errors': errors,
+        }
+        r = results[name]
+        print(f"{name:48} p50 {r['p50_ms']:8.2f}ms  p95 {r['p95_ms']:8.2f}ms  p99 {r['p99_ms']:8.2f}ms  "
+              f"queries {r['queries_p50']:3}  peak {r['peak_kb']:9.1f}KB  errors {errors}")
+
+    return {
+        'generated_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'settings': {'iterations': args.iterations, 'users_per_role': args.users_per_role,
+                     'writes': args.writes, 'seed': args.seed},
+        'database': database,
+        'endpoints': results,
+    }
+
+def compare(report, baseline, threshold):
+    """Print per-endpoint changes against a baseline report; returns the number of regressions."""
+    regressions = 0
+    print(f"\n--- Compared with {baseline['generated_at']} (threshold {threshold:.0%}) ---")
+    for name, current in report['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if before is None:
+            print(f"NEW  {name}")
+            continue
+        flags = []
+        for key in ('p95_ms', 'queries_p50', 'peak_kb'):
+            old, new = before[key], current[key]
+            if old and (new - old) / old > threshold and not (key == 'queries_p50' and new - old < 1):
+                flags.append(f"{key} {old} -> {new}")
+        status = 'WORSE' if flags else 'OK'
+        regressions += bool(flags)
+        change = (current['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0
+        print(f"{status:5} {name:48} p95 {before['p95_ms']:8.2f} -> {current['p95_ms']:8.2f}ms ({change:+.0%})"
+              + (f"  [{'; '.join(flags)}]" if flags else ''))
+    print(f"\n{regressions} regression(s)")
+    return regressions
+
+def main():
+    args = parse_args()
+    report = run(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        return 1 if compare(report, baseline, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
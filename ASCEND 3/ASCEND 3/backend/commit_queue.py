@@ -0,0 +1,88 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db
+
+# ==========================================
+# Commit-synchronised in-memory state
+# ==========================================
+# The identity cache, the leaderboard, the unanswered-question queues and the
+# mentor recommender all mirror database rows in process memory, and they all
+# learn about writes the same way: the write path (or a flush hook) queues
+# changes on the session, the queue is applied once the transaction commits
+# and dropped if it rolls back. CommitQueue owns one such queue and its
+# session listeners.
+#
+# Writes made by other worker processes never reach this process's queues,
+# so the indexes are also reloaded from the database on first use and
+# whenever they are older than their rebuild interval. That interval is how
+# far a process can lag behind writes made elsewhere; RebuiltIndex keeps the
+# bookkeeping for it.
+
+class CommitQueue:
+    """Changes queued on a session under `name` and passed to `apply` on commit.
+
+    `fields` maps every field of the queue to the factory of its empty
+    container. apply(**fields) runs after a commit that queued anything.
+    """
+
+    def __init__(self, name, apply, **fields):
+        self.name = name
+        self.apply = apply
+        self.fields = fields
+        self._listening = False
+
+    def pending(self, session=None):
+        """The {field: container} queue of `session` (db.session by default), to add to."""
+        session = session if session is not None else db.session()
+        queued = session.info.get(self.name)
+        if queued is None:
+            queued = session.info[self.name] = {field: factory() for field, factory in self.fields.items()}
+        return queued
+
+    def listen(self, collect=None, flush_event='after_flush'):
+        """Register the commit/rollback listeners, and collect(session, queued) on flush_event.
+
+        Use 'after_flush' when the collector needs ids of new rows and
+        'before_flush' when it needs the objects the flush will write.
+        """
+        if self._listening:
+            return
+        self._listening = True
+        if collect is not None:
+            event.listen(Session, flush_event, lambda session, *args: collect(session, self.pending(session)))
+        event.listen(Session, 'after_commit', self._commit)
+        event.listen(Session, 'after_soft_rollback', self._discard)
+
+    def _commit(self, session):
+        queued = session.info.pop(self.name, None)
+        if queued and any(queued.values()):
+            self.apply(**queued)
+
+    def _discard(self, session, previous_transaction):
+        session.info.pop(self.name, None)
+
+class RebuiltIndex:
+    """Base for an index that is reloaded every `rebuild_interval` seconds.
+
+    Subclasses guard their state with self._lock, check _expired() before
+    reading and set self._built_at when they finish loading.
+    """
+
+    def __init__(self, rebuild_interval=300):
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.Lock()
+        self._built_at = None
+
+    def configure(self, app, setting):
+        app.config.setdefault(setting, 300)
+        self.rebuild_interval = app.config[setting]
+
+    def reset(self):
+        """Force a full reload on the next read."""
+        with self._lock:
+            self._built_at = None
+
+    def _expired(self):
+        return self._built_at is None or time.time() - self._built_at > self.rebuild_interval
@@ -6,3 +6,44 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-key-please-change-in-production-982374928374'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(basedir, 'ascend.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Read replicas for GET traffic (see db_routing.py); comma-separated URLs
+    SQLALCHEMY_READ_URIS = [u for u in os.environ.get('DATABASE_READ_URLS', '').split(',') if u]
+    READ_YOUR_WRITES_WINDOW = int(os.environ.get('READ_YOUR_WRITES_WINDOW', 5))
+    # Password hashing pool (see hashing.py); HASH_POOL_WORKERS=0 hashes inline
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    HASH_POOL_WORKERS = int(os.environ.get('HASH_POOL_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+    HASH_QUEUE_LIMIT = int(os.environ.get('HASH_QUEUE_LIMIT', 32))
+    HASH_TIMEOUT = float(os.environ.get('HASH_TIMEOUT', 10))
+    # Bearer token -> user snapshot cache (see identity.py)
+    AUTH_CACHE_SIZE = int(os.environ.get('AUTH_CACHE_SIZE', 1024))
+    AUTH_CACHE_TTL = int(os.environ.get('AUTH_CACHE_TTL', 60))
+    # Catalogue response cache (see response_cache.py)
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 300))
+    RESPONSE_CACHE_MAX_AGE = int(os.environ.get('RESPONSE_CACHE_MAX_AGE', 0))
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 256)) # Entries per group
+    # Full rebuild interval for the mentor recommendation matrix (see recommendations.py)
+    RECOMMENDER_REBUILD_INTERVAL = int(os.environ.get('RECOMMENDER_REBUILD_INTERVAL', 300))
+    # Full rebuild interval for the in-memory points leaderboard (see leaderboard.py)
+    LEADERBOARD_REBUILD_INTERVAL = int(os.environ.get('LEADERBOARD_REBUILD_INTERVAL', 300))
+    # Full rebuild interval for the unanswered question queues (see question_queue.py)
+    QUESTION_QUEUE_REBUILD_INTERVAL = int(os.environ.get('QUESTION_QUEUE_REBUILD_INTERVAL', 300))
+    # SQLite production profile (see sqlite_tuning.py); SQLITE_JOURNAL_MODE='' keeps the file's mode
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024)) # Negative: KiB
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)) # Milliseconds
+    SQLITE_SINGLE_WRITER = os.environ.get('SQLITE_SINGLE_WRITER', '1') != '0'
+    SQLITE_POOL_SIZE = int(os.environ.get('SQLITE_POOL_SIZE', 10))
+    SQLITE_POOL_OVERFLOW = int(os.environ.get('SQLITE_POOL_OVERFLOW', 20))
+    # Opt-in request profiling (see profiling.py); PROFILING_CAPTURE is '', 'cprofile' or 'pyinstrument'
+    PROFILING_ENABLED = os.environ.get('PROFILING', '0') != '0'
+    PROFILING_SLOW_MS = int(os.environ.get('PROFILING_SLOW_MS', 500))
+    PROFILING_REPEAT_THRESHOLD = int(os.environ.get('PROFILING_REPEAT_THRESHOLD', 5))
+    PROFILING_CAPTURE = os.environ.get('PROFILING_CAPTURE', '')
+    PROFILING_LOG = os.environ.get('PROFILING_LOG') or os.path.join(basedir, 'instance', 'perf.log')
+    # Open /api/events streams per process, each holding a server thread (see events.py); 0 is no cap
+    EVENTS_MAX_STREAMS = int(os.environ.get('EVENTS_MAX_STREAMS', 0))
+    # Prometheus metrics at /metrics (see metrics.py); set METRICS_TOKEN to require it as a bearer token
+    METRICS_ENABLED = os.environ.get('METRICS', '1') != '0'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
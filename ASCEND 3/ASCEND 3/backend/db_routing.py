@@ -0,0 +1,127 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+# ==========================================
+# Read/write session routing
+# ==========================================
+# With SQLALCHEMY_READ_URIS configured, reads made while serving GET/HEAD
+# requests go to a replica engine, picked at random once per request and
+# kept in session.info, so a request never mixes two replicas' snapshots;
+# everything else uses the primary. A session switches to the primary for
+# good at its first write (flush, INSERT/UPDATE/DELETE or a non-SELECT text
+# statement), so a request always reads its own writes. After a request that wrote, that user's reads
+# stay on the primary for READ_YOUR_WRITES_WINDOW seconds to cover replica
+# lag. The window is tracked per process, like the other in-memory caches.
+#
+# Reads that fill a process-wide structure (index rebuilds, the identity
+# cache) or that decide a write in a GET handler must not see a lagging
+# replica: run them inside `with primary():` or decorate the view with
+# @reads_primary. Without replicas the session behaves exactly like
+# Flask-SQLAlchemy's.
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+READ_STATEMENTS = ('SELECT', 'WITH', 'PRAGMA', 'EXPLAIN')
+
+class RecentWriters:
+    def __init__(self, window=5):
+        self.window = window
+        self._lock = threading.Lock()
+        self._written_at = {} # user_id -> time of the last write
+
+    def mark(self, user_id):
+        now = time.time()
+        with self._lock:
+            self._written_at[user_id] = now
+            if len(self._written_at) > 1024:
+                self._written_at = {k: t for k, t in self._written_at.items() if now - t < self.window}
+
+    def wrote_recently(self, user_id):
+        if user_id is None:
+            return False
+        with self._lock:
+            written_at = self._written_at.get(user_id)
+        return written_at is not None and time.time() - written_at < self.window
+
+recent_writers = RecentWriters()
+
+def _is_write(clause):
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        words = clause.text.split(None, 1)
+        return bool(words) and words[0].upper() not in READ_STATEMENTS
+    return False
+
+def _replica(session):
+    """The session's read replica engine, or None to use the primary."""
+    if session.info.get('primary') or not has_request_context():
+        return None
+    engines = current_app.extensions.get('read_replicas')
+    if not engines or request.method not in READ_METHODS:
+        return None
+    user = g.get('_login_user')
+    if recent_writers.wrote_recently(getattr(user, 'id', None)):
+        return None
+    replica = session.info.get('replica')
+    if replica is None:
+        # A streamed body reads through a second session; it stays on the request's replica
+        if 'read_replica' not in g:
+            g.read_replica = random.choice(engines)
+        replica = session.info['replica'] = g.read_replica
+    return replica
+
+@contextmanager
+def primary(session=None):
+    """Send the session's reads inside the block to the primary."""
+    session = session if session is not None else current_app.extensions['sqlalchemy'].session()
+    depth = session.info.get('primary', 0)
+    session.info['primary'] = depth + 1
+    try:
+        yield session
+    finally:
+        session.info['primary'] = depth
+
+def reads_primary(view):
+    """For GET views whose reads decide a write."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with primary():
+            return view(*args, **kwargs)
+    return wrapper
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self.info.get('wrote'):
+            if self._flushing or _is_write(clause):
+                self.info['wrote'] = True
+            else:
+                replica = _replica(self)
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def _remember_writer(response):
+    session = current_app.extensions['sqlalchemy'].session
+    user = g.get('_login_user')
+    if session.info.get('wrote') and getattr(user, 'id', None) is not None:
+        recent_writers.mark(user.id)
+    return response
+
+def init_app(app):
+    app.config.setdefault('SQLALCHEMY_READ_URIS', [])
+    app.config.setdefault('READ_YOUR_WRITES_WINDOW', 5)
+    recent_writers.window = app.config['READ_YOUR_WRITES_WINDOW']
+    uris = app.config['SQLALCHEMY_READ_URIS']
+    if not uris:
+        return
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    app.extensions['read_replicas'] = [create_engine(uri, **options) for uri in uris]
+    app.after_request(_remember_writer)
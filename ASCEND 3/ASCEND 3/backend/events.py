@@ -0,0 +1,112 @@
+import json
+import queue
+import threading
+from collections import defaultdict
+
+KEEPALIVE_SECONDS = 15
+
+# ==========================================
+# In-process pub/sub for Server-Sent Events
+# ==========================================
+# Write paths publish per-user events here and every open /api/events stream
+# for that user receives them. Subscribers live in this process only, so run a
+# single worker process (threads are fine) or put a shared broker in front.
+#
+# An open stream occupies a server thread for as long as the page is open.
+# EVENTS_MAX_STREAMS caps the streams per process (0: no cap) so they cannot
+# take every thread; past it, stream() raises StreamLimitReached and the
+# client falls back to polling until it gets a slot.
+
+class StreamLimitReached(Exception):
+    pass
+
+class EventBroker:
+    def __init__(self, max_queue=100, max_streams=0):
+        self.max_queue = max_queue
+        self.max_streams = max_streams
+        self._subscribers = defaultdict(set)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            if self.max_streams and self._count >= self.max_streams:
+                raise StreamLimitReached()
+            self._subscribers[user_id].add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers and subscription in subscribers:
+                subscribers.discard(subscription)
+                self._count -= 1
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def publish(self, user_id, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.put_nowait((event, data))
+            except queue.Full:
+                # Stalled client; drop rather than block the writer
+                pass
+
+    def stream(self, user_id, initial=()):
+        """Subscribe now and return a generator of SSE frames for one client.
+
+        Subscribing before the first frame is pulled means nothing published
+        between the view returning and the client reading is lost. Raises
+        StreamLimitReached when the process is already at max_streams.
+        """
+        subscription = self.subscribe(user_id)
+
+        def generate():
+            try:
+                for event, data in initial:
+                    yield format_sse(event, data)
+                while True:
+                    try:
+                        event, data = subscription.get(timeout=KEEPALIVE_SECONDS)
+                    except queue.Empty:
+                        yield ': keep-alive\n\n'
+                        continue
+                    yield format_sse(event, data)
+            finally:
+                self.unsubscribe(user_id, subscription)
+
+        return EventStream(generate(), lambda: self.unsubscribe(user_id, subscription))
+
+class EventStream:
+    """Response body for one stream.
+
+    close() unsubscribes even if the body was never iterated (the client went
+    away before the first frame), which a bare generator's finally would not.
+    """
+
+    def __init__(self, frames, on_close):
+        self._frames = frames
+        self._on_close = on_close
+
+    def __iter__(self):
+        return self._frames
+
+    def close(self):
+        self._frames.close()
+        self._on_close()
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+broker = EventBroker()
+
+def publish(user_id, event, data):
+    broker.publish(user_id, event, data)
+
+def init_app(app):
+    app.config.setdefault('EVENTS_MAX_STREAMS', 0)
+    broker.max_streams = app.config['EVENTS_MAX_STREAMS']
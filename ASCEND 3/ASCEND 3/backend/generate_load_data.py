@@ -0,0 +1,325 @@
+"""Synthetic data generator for load and benchmark runs.
+
+Recreates the configured database (DATABASE_URL) and fills it with a
+parameterised, reproducible population: users with profiles, skills and
+experience, questions with replies, discussion threads, roadmaps,
+mentorships and private messages. Rows are written with multi-row INSERTs
+in batches, one commit per table, and every denormalized column (reply
+stats, unread counters, conversations, points ledger, mentor stats, search
+index) is filled in so the API sees a consistent database.
+
+    DATABASE_URL=sqlite:////tmp/load.db python generate_load_data.py --users 100000 --messages 1000000
+
+Activity is heavy-tailed: each user gets a Pareto weight, so a few users ask,
+answer and message far more than the rest. Every generated account uses the
+password "password123"; the demo accounts from seed_db.py are always user
+ids 1-3 (admin, student, mentor).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam
+
+sys.path.append(os.getcwd())
+
+from app import app, db
+from models import (User, ProfileInfo, Skill, Company, Experience, Question, Reply, DiscussionThread,
+                    ThreadLike, CareerPath, Roadmap, RoadmapSave, MentorshipRequest, Message, Conversation,
+                    MentorStats, PointsTransaction)
+
+ROLES = ('student', 'mentor', 'alumni')
+ROLE_WEIGHTS = (85, 11, 4)
+FIRST_NAMES = ('Aisha', 'Ben', 'Carlos', 'Dana', 'Elif', 'Farah', 'Gabriel', 'Hana', 'Ivan', 'Jia', 'Kofi',
+               'Lena', 'Mateo', 'Nadia', 'Omar', 'Priya', 'Quinn', 'Rahul', 'Sofia', 'Tomas', 'Uma', 'Viktor',
+               'Wen', 'Ximena', 'Yusuf', 'Zara')
+LAST_NAMES = ('Adams', 'Brown', 'Chen', 'Diaz', 'Evans', 'Fischer', 'Garcia', 'Haddad', 'Ito', 'Johnson',
+              'Khan', 'Lopez', 'Müller', 'Nguyen', 'Okafor', 'Patel', 'Rossi', 'Silva', 'Tanaka', 'Williams')
+SKILLS = ('Python', 'Flask', 'JavaScript', 'React', 'SQL', 'Machine Learning', 'Data Analysis', 'Java',
+          'Go', 'Rust', 'Kubernetes', 'AWS', 'System Design', 'Product Management', 'UX Research', 'Figma',
+          'Statistics', 'Excel', 'Financial Modeling', 'Public Speaking', 'Leadership', 'C++', 'TypeScript',
+          'Docker', 'Node.js', 'Deep Learning', 'NLP', 'Spark', 'Tableau', 'Negotiation')
+COMPANIES = ('Google', 'Microsoft', 'Amazon', 'Meta', 'Apple', 'Netflix', 'Stripe', 'Airbnb', 'Uber',
+             'Spotify', 'Shopify', 'Atlassian', 'Salesforce', 'Adobe', 'Nvidia', 'Intel', 'IBM', 'Oracle',
+             'Goldman Sachs', 'JP Morgan', 'McKinsey', 'Deloitte', 'Accenture', 'Tesla', 'SpaceX',
+             'Databricks', 'Snowflake', 'Figma', 'Notion', 'Canva')
+JOB_TITLES = ('Software Engineer', 'Senior Software Engineer', 'Staff Engineer', 'Engineering Manager',
+              'Data Scientist', 'ML Engineer', 'Product Manager', 'Designer', 'Analyst', 'Consultant',
+              'Principal Engineer', 'Director of Engineering')
+TOPICS = ('system design interviews', 'my first internship', 'switching to product management',
+          'learning machine learning', 'negotiating an offer', 'a masters degree', 'open source',
+          'building a portfolio', 'leetcode practice', 'getting referrals', 'remote work',
+          'data engineering', 'frontend frameworks', 'career gaps', 'startup vs big tech')
+VERBS = ('prepare for', 'get started with', 'think about', 'approach', 'get better at', 'decide on')
+CATEGORIES = ('Career Advice', 'Interviews', 'Learning', 'Industry', 'General')
+PATHS = (('Software Engineering', 'Build and ship software products.'),
+         ('Product Management', 'Lead products from idea to launch.'),
+         ('Data Science', 'Turn data into decisions.'),
+         ('Investment Banking', 'Advise on deals and capital markets.'))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--questions', type=int, help='Default: one per user')
+    parser.add_argument('--replies-per-question', type=float, default=1.5, help='Mean, answered questions only')
+    parser.add_argument('--unanswered', type=float, default=0.3, help='Share of questions with no replies')
+    parser.add_argument('--messages', type=int, help='Default: ten per user')
+    parser.add_argument('--mentorships', type=int, help='Default: one request per two users')
+    parser.add_argument('--threads', type=int, help='Default: one per twenty users')
+    parser.add_argument('--roadmaps', type=int, default=40)
+    parser.add_argument('--days', type=int, default=365, help='History length')
+    parser.add_argument('--batch', type=int, default=5000, help='Rows per INSERT batch')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-search', action='store_true', help='Do not build the search index')
+    parser.add_argument('--yes', action='store_true', help='Do not ask before dropping the database')
+    args = parser.parse_args()
+    args.questions = args.users if args.questions is None else args.questions
+    args.messages = args.users * 10 if args.messages is None else args.messages
+    args.mentorships = args.users // 2 if args.mentorships is None else args.mentorships
+    args.threads = max(1, args.users // 20) if args.threads is None else args.threads
+    return args
+
+class Population:
+    """Weighted sampling of user ids, heavy-tailed by per-user activity."""
+    def __init__(self, rng, ids):
+        self.rng = rng
+        self.ids = ids
+        weights = [rng.paretovariate(1.2) for _ in ids]
+        total = 0.0
+        self.cum_weights = []
+        for w in weights:
+            total += w
+            self.cum_weights.append(total)
+
+    def pick(self, k=1):
+        return self.rng.choices(self.ids, cum_weights=self.cum_weights, k=k)
+
+    def one(self):
+        return self.pick()[0]
+
+def sorted_times(rng, count, start, end):
+    """`count` ascending timestamps spread uniformly over [start, end)."""
+    span = (end - start).total_seconds()
+    return [start + timedelta(seconds=s) for s in sorted(rng.random() * span for _ in range(count))]
+
+def bulk_insert(model, rows, batch):
+    """Multi-row INSERT of an iterable of dicts, `batch` rows at a time; returns the row count."""
+    table = model.__table__
+    count = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= batch:
+            db.session.execute(table.insert(), chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(table.insert(), chunk)
+        count += len(chunk)
+    db.session.commit()
+    return count
+
+def generate(args):
+    rng = random.Random(args.seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    start = now - timedelta(days=args.days)
+    account = User(username='', email='')
+    account.set_password('password123')
+    password_hash = account.password_hash
+    counts = {}
+
+    def step(name, model, rows):
+        began = time.time()
+        counts[name] = bulk_insert(model, rows, args.batch)
+        print(f"{name}: {counts[name]} rows in {time.time() - began:.1f}s")
+
+    # Users, profiles, skills, experience
+    roles = {1: 'admin', 2: 'student', 3: 'mentor'}
+    for user_id in range(4, args.users + 1):
+        roles[user_id] = rng.choices(ROLES, ROLE_WEIGHTS)[0]
+    joined = dict(zip(sorted(roles), sorted_times(rng, len(roles), start, now - timedelta(days=1))))
+    students = Population(rng, [i for i, r in roles.items() if r == 'student'])
+    mentors = Population(rng, [i for i, r in roles.items() if r in ('mentor', 'alumni')])
+    everyone = Population(rng, [i for i, r in roles.items() if r != 'admin'])
+    names = {i: f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for i in roles}
+    names.update({1: 'Admin User', 2: 'Demo Student', 3: 'Dr. Sarah Chen'})
+    emails = {1: 'admin@ascend.com', 2: 'student@demo.com', 3: 'mentor@demo.com'}
+
+    # Questions are decided before users are written: bounties come out of the opening balance
+    question_times = sorted_times(rng, args.questions, start, now)
+    balances = {i: rng.randint(100, 1000) for i in roles}
+    opening = dict(balances)
+    questions = []
+    ledger = [{'user_id': i, 'amount': opening[i], 'balance_after': opening[i], 'reason': 'opening_balance',
+               'created_at': joined[i]} for i in roles]
+    for question_id, asked_at in enumerate(question_times, start=1):
+        author = students.one()
+        bounty = 0
+        if rng.random() < 0.15:
+            bounty = min(rng.choice((10, 20, 50, 100)), balances[author])
+        questions.append({'id': question_id, 'user_id': author, 'created_at': max(asked_at, joined[author]),
+                          'is_urgent': bounty > 0, 'bounty': bounty})
+        if bounty:
+            balances[author] -= bounty
+            ledger.append({'user_id': author, 'amount': -bounty, 'balance_after': balances[author],
+                           'reason': 'bounty', 'question_id': question_id, 'created_at': asked_at})
+
+    step('users', User, ({
+        'id': i,
+        'username': names[i] if i in emails else f"user{i}",
+        'email': emails.get(i, f"user{i}@load.test"),
+        'password_hash': password_hash,
+        'role': role,
+        'is_verified': i in emails or role == 'student' or rng.random() < 0.8,
+        'points': balances[i],
+        'unread_messages': 0,
+        'created_at': joined[i]
+    } for i, role in roles.items()))
+    step('profile_info', ProfileInfo, ({
+        'user_id': i,
+        'full_name': names[i],
+        'bio': f"{names[i]} is interested in {rng.choice(TOPICS)}.",
+        'university': f"University {rng.randint(1, 200)}" if role == 'student' else None,
+        'degree': 'B.S. Computer Science' if role == 'student' else None,
+        'graduation_year': rng.randint(2024, 2030) if role == 'student' else None,
+        'current_goal': f"Get better at {rng.choice(TOPICS)}",
+        'company': rng.choice(COMPANIES) if role != 'student' else None,
+        'job_title': rng.choice(JOB_TITLES) if role != 'student' else None
+    } for i, role in roles.items() if role != 'admin'))
+    step('skills', Skill, ({'user_id': i, 'name': name} for i, role in roles.items() if role != 'admin'
+                            for name in rng.sample(SKILLS, rng.randint(1, 5))))
+    step('companies', Company, ({'id': n, 'name': name, 'description': f"{name} careers."}
+                                for n, name in enumerate(COMPANIES, start=1)))
+    step('experiences', Experience, ({
+        'user_id': i,
+        'company_id': rng.randint(1, len(COMPANIES)),
+        'role': rng.choice(JOB_TITLES),
+        'start_date': (joined[i] - timedelta(days=365 * (n + 1))).date(),
+        'description': 'Worked on the core platform.'
+    } for i, role in roles.items() if role in ('mentor', 'alumni') for n in range(rng.randint(1, 3))))
+
+    # Questions and replies
+    replies = []
+    for q in questions:
+        if rng.random() < args.unanswered:
+            q.update(reply_count=0, is_answered=False, last_reply_at=None)
+            continue
+        # At least one reply, geometric-ish tail with the requested mean, spaced hours apart
+        count = 1
+        if args.replies_per_question > 1:
+            count += int(rng.expovariate(1 / (args.replies_per_question - 1)))
+        replied_at, last_reply_at, added = q['created_at'], None, 0
+        for _ in range(count):
+            replied_at += timedelta(seconds=rng.expovariate(1 / (6 * 3600)))
+            if replied_at >= now:
+                break
+            replies.append({'id': len(replies) + 1, 'question_id': q['id'], 'user_id': mentors.one(),
+                            'content': f"Here is how I would {rng.choice(VERBS)} {rng.choice(TOPICS)}.",
+                            'created_at': replied_at})
+            last_reply_at, added = replied_at, added + 1
+        q.update(reply_count=added, is_answered=added > 0, last_reply_at=last_reply_at)
+    step('questions', Question, ({
+        **q,
+        'title': f"How do I {rng.choice(VERBS)} {rng.choice(TOPICS)}?",
+        'content': f"I'm trying to {rng.choice(VERBS)} {rng.choice(TOPICS)} and could use some advice. " * rng.randint(1, 4)
+    } for q in questions))
+    step('replies', Reply, replies)
+    step('points_transactions', PointsTransaction, ledger)
+    del questions, replies, ledger
+
+    # Community: threads, likes, roadmaps, saves
+    thread_times = sorted_times(rng, args.threads, start, now)
+    step('discussion_threads', DiscussionThread, ({
+        'id': n, 'title': f"Thoughts on {rng.choice(TOPICS)}?", 'category': rng.choice(CATEGORIES),
+        'user_id': everyone.one(), 'created_at': created_at
+    } for n, created_at in enumerate(thread_times, start=1)))
+    step('thread_likes', ThreadLike, ({'thread_id': n, 'user_id': user_id, 'created_at': now}
+                                      for n in range(1, args.threads + 1)
+                                      for user_id in set(everyone.pick(min(int(rng.paretovariate(1.5)) - 1, 500)))))
+    step('career_paths', CareerPath, ({'id': n, 'title': title, 'description': description}
+                                      for n, (title, description) in enumerate(PATHS, start=1)))
+    step('roadmaps', Roadmap, ({
+        'id': n, 'title': f"Roadmap: {rng.choice(TOPICS)}", 'description': 'Step by step.',
+        'steps': '\n'.join(f"Step {s}" for s in range(1, 6)), 'career_path_id': rng.randint(1, len(PATHS)),
+        'creator_id': mentors.one(), 'save_count': 0
+    } for n in range(1, args.roadmaps + 1)))
+    step('roadmap_saves', RoadmapSave, ({'roadmap_id': n, 'user_id': user_id, 'created_at': now}
+                                        for n in range(1, args.roadmaps + 1)
+                                        for user_id in set(students.pick(rng.randint(0, 50)))))
+
+    # Mentorships
+    pairs = set()
+    for _ in range(args.mentorships):
+        pairs.add((students.one(), mentors.one()))
+    pairs = sorted(pairs)
+    statuses = {pair: rng.choices(('accepted', 'pending', 'rejected'), (60, 25, 15))[0] for pair in pairs}
+    step('mentorship_requests', MentorshipRequest, ({
+        'student_id': student_id, 'mentor_id': mentor_id, 'status': statuses[(student_id, mentor_id)],
+        'message': 'I would love your guidance.',
+        'created_at': max(joined[student_id], joined[mentor_id]) + timedelta(days=rng.random())
+    } for student_id, mentor_id in pairs))
+
+    # Messages and conversations
+    # Conversations are mostly accepted mentorships, plus some cold messages
+    conversation_pairs = [pair for pair in pairs if statuses[pair] == 'accepted']
+    conversation_pairs += [(students.one(), mentors.one()) for _ in range(max(1, len(conversation_pairs) // 4))]
+    conversations = Population(rng, conversation_pairs)
+    summary = {} # (user_id, partner_id) -> [last_message_id, last_message_at, unread_count]
+    unread = {}
+    read_before = now - timedelta(days=3)
+
+    def messages():
+        for message_id, sent_at in enumerate(sorted_times(rng, args.messages, start, now), start=1):
+            a, b = conversations.one()
+            sender, recipient = (a, b) if rng.random() < 0.5 else (b, a)
+            sent_at = max(sent_at, joined[a], joined[b])
+            is_read = sent_at < read_before or rng.random() < 0.5
+            summary[(sender, recipient)] = [message_id, sent_at, summary.get((sender, recipient), [0, 0, 0])[2]]
+            incoming = summary.setdefault((recipient, sender), [message_id, sent_at, 0])
+            incoming[0], incoming[1] = message_id, sent_at
+            if not is_read:
+                incoming[2] += 1
+                unread[recipient] = unread.get(recipient, 0) + 1
+            yield {'id': message_id, 'sender_id': sender, 'recipient_id': recipient,
+                   'content': f"Thanks! Quick question about {rng.choice(TOPICS)}.",
+                   'created_at': sent_at, 'is_read': is_read}
+    step('messages', Message, messages())
+    step('conversations', Conversation, ({
+        'user_id': user_id, 'partner_id': partner_id, 'last_message_id': last_id,
+        'last_message_at': last_at, 'unread_count': unread_count
+    } for (user_id, partner_id), (last_id, last_at, unread_count) in summary.items()))
+    users = User.__table__
+    for chunk in range(0, len(unread), args.batch):
+        db.session.execute(
+            users.update().where(users.c.id == bindparam('user_id')).values(unread_messages=bindparam('unread')),
+            [{'user_id': user_id, 'unread': count} for user_id, count in list(unread.items())[chunk:chunk + args.batch]])
+    db.session.commit()
+
+    # Rollups
+    began = time.time()
+    counts['mentor_stats'] = MentorStats.rebuild()
+    print(f"mentor_stats: {counts['mentor_stats']} rows in {time.time() - began:.1f}s")
+    if not args.skip_search:
+        from search import rebuild_index
+        began = time.time()
+        counts['search_index'] = rebuild_index()
+        print(f"search_index: {counts['search_index']} documents in {time.time() - began:.1f}s")
+    return counts
+
+def main():
+    args = parse_args()
+    with app.app_context():
+        print(f"Target database: {db.engine.url.render_as_string(hide_password=True)}")
+        if not args.yes and input("This drops every table in it. Continue? [y/N] ").strip().lower() != 'y':
+            return 1
+        began = time.time()
+        db.drop_all()
+        db.create_all()
+        generate(args)
+        print(f"Done in {time.time() - began:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import glob
+import os
+import tempfile
+
+# ==========================================
+# gunicorn settings
+# ==========================================
+# Run with: gunicorn -c gunicorn.conf.py app:app
+#
+# Wires up multi-process metrics (see metrics.py): every worker gets the same
+# PROMETHEUS_MULTIPROC_DIR, emptied when the server starts, and child_exit
+# tells prometheus_client when a worker is gone. prometheus_client picks
+# between in-process and mmap'ed values when it is first imported, so the
+# variable is set here, before anything imports it; this file must not import
+# it at the top either.
+#
+# Server-Sent Events need a single worker process (see events.py), so
+# WEB_CONCURRENCY defaults to 1. Each open /api/events stream holds a gthread
+# thread for as long as its page is open, so EVENTS_MAX_STREAMS is capped
+# RESERVED_THREADS below the thread count; streams past it get a 503 and the
+# page polls instead, and ordinary requests always have threads left.
+
+RESERVED_THREADS = 8 # Threads kept free of event streams
+
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'ascend-metrics'))
+
+bind = os.environ.get('BIND', '127.0.0.1:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+os.environ.setdefault('EVENTS_MAX_STREAMS', str(max(1, threads - RESERVED_THREADS)))
+
+def on_starting(server):
+    # Runs in the master before any worker is forked
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    os.makedirs(path, exist_ok=True)
+    for name in glob.glob(os.path.join(path, '*.db')):
+        os.remove(name) # Values left over from a previous run
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
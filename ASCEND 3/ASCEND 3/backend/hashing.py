@@ -0,0 +1,142 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+from metrics import HASH_REJECTED, HASH_TIME
+
+# ==========================================
+# Password hashing pool
+# ==========================================
+# scrypt/pbkdf2 are deliberately CPU-bound. Running them inline pins a request
+# thread for the whole hash, so during a login storm every worker ends up
+# hashing and all API latency spikes. Hashes are computed on a small dedicated
+# process pool instead; at most HASH_POOL_WORKERS + HASH_QUEUE_LIMIT jobs may be
+# in flight, and anything beyond that is rejected with HashPoolSaturated so the
+# route can answer 429 rather than queue without bound. A job that times out,
+# or a pool whose worker died, raises HashPoolUnavailable (503); a broken pool
+# is replaced so the next request gets a working one.
+
+class HashPoolSaturated(Exception):
+    pass
+
+class HashPoolUnavailable(Exception):
+    pass
+
+class HashPool:
+    def __init__(self):
+        self.method = 'scrypt:32768:8:1'
+        self.workers = 0
+        self.timeout = 10
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def configure(self, method, workers, queue_limit, timeout):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_limit) if workers else None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a multi-threaded server process is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def run(self, fn, *args):
+        if not self.workers:
+            # Pool disabled (scripts, tests): hash inline
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            HASH_REJECTED.inc()
+            raise HashPoolSaturated()
+        try:
+            executor, future = self._submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # The job keeps its slot until it finishes
+            raise HashPoolUnavailable()
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise HashPoolUnavailable()
+
+    def _submit(self, fn, *args):
+        # A pool that broke since the last job is replaced once
+        for _ in range(2):
+            executor = self._get_executor()
+            try:
+                return executor, executor.submit(fn, *args)
+            except BrokenProcessPool:
+                self._discard(executor)
+        raise HashPoolUnavailable()
+
+    def _discard(self, executor):
+        """Drop a broken executor; _get_executor starts a fresh one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+pool = HashPool()
+
+def init_app(app):
+    app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    app.config.setdefault('HASH_POOL_WORKERS', max(1, (os.cpu_count() or 2) // 2))
+    app.config.setdefault('HASH_QUEUE_LIMIT', 32)
+    app.config.setdefault('HASH_TIMEOUT', 10)
+    pool.configure(
+        app.config['PASSWORD_HASH_METHOD'],
+        app.config['HASH_POOL_WORKERS'],
+        app.config['HASH_QUEUE_LIMIT'],
+        app.config['HASH_TIMEOUT']
+    )
+
+def _timed(operation, fn, *args):
+    started = time.perf_counter()
+    result = pool.run(fn, *args)
+    HASH_TIME.labels(operation).observe(time.perf_counter() - started)
+    return result
+
+def hash_password(password):
+    """Hash with the configured method.
+
+    Raises HashPoolSaturated when busy, HashPoolUnavailable on timeout or a broken pool.
+    """
+    return _timed('hash', generate_password_hash, password, pool.method)
+
+def verify_password(pw_hash, password):
+    """Check a password. Raises like hash_password."""
+    if not pw_hash:
+        return False
+    return _timed('verify', check_password_hash, pw_hash, password)
+
+def _parameters(method):
+    """A werkzeug method string with its defaults filled in, as werkzeug stores it."""
+    name, *args = method.split(':')
+    if name == 'scrypt' and not args:
+        return ('scrypt', '32768', '8', '1')
+    if name == 'pbkdf2' and len(args) < 2:
+        return ('pbkdf2', args[0] if args else 'sha256', str(DEFAULT_PBKDF2_ITERATIONS))
+    return (name, *args)
+
+def needs_rehash(pw_hash):
+    """True when the stored hash was made with different parameters than configured."""
+    return bool(pw_hash) and _parameters(pw_hash.split('$', 1)[0]) != _parameters(pool.method)
@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import OrderedDict
+from flask_login import UserMixin
+from commit_queue import CommitQueue
+from db_routing import primary
+from models import User, ProfileInfo, db
+from metrics import cache_lookup
+
+# ==========================================
+# Identity cache
+# ==========================================
+# Maps a bearer token to a small snapshot of the user it belongs to, so an
+# authenticated request does not have to decode the JWT and load the user row
+# (plus profile) every time. Entries expire after AUTH_CACHE_TTL seconds or at
+# the token's own expiry, and are dropped explicitly whenever a write changes
+# one of the snapshot fields: ORM changes to User/ProfileInfo are picked up on
+# commit automatically, bulk Query.update() writes must call
+# invalidate_on_commit. Other workers only see a change once their entry
+# expires.
+
+SNAPSHOT_FIELDS = ('id', 'username', 'email', 'role', 'is_verified', 'points', 'display_name')
+
+class IdentityCache:
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict() # token -> (expires_at, snapshot dict)
+        self._tokens_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= time.time():
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+            return snapshot
+
+    def put(self, token, snapshot, token_expires_at):
+        expires_at = min(time.time() + self.ttl, token_expires_at)
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = (expires_at, snapshot)
+            self._tokens_by_user.setdefault(snapshot['id'], set()).add(token)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[1]['id']
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+identity_cache = IdentityCache()
+
+class UserSnapshot(UserMixin):
+    """current_user backed by a cached snapshot.
+
+    Snapshot fields are served from memory. Any other attribute (relationships
+    such as profile_info or skills) loads the real User row once for the request
+    and is delegated to it, as are all attribute writes.
+    """
+
+    def __init__(self, snapshot, user=None):
+        self.__dict__.update(snapshot)
+        self.__dict__['_user'] = user
+
+    @property
+    def user(self):
+        if self.__dict__['_user'] is None:
+            self.__dict__['_user'] = db.session.get(User, self.__dict__['id'])
+        return self.__dict__['_user']
+
+    def __getattr__(self, name):
+        # Only called for attributes not in the snapshot
+        return getattr(self.user, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.user, name, value)
+        if name in SNAPSHOT_FIELDS:
+            self.__dict__[name] = value
+
+def snapshot_of(user):
+    return {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+
+def load_identity(token):
+    """Return a UserSnapshot for a bearer token, or None if it is invalid."""
+    snapshot = identity_cache.get(token)
+    cache_lookup('identity', snapshot is not None)
+    user = None
+    if snapshot is None:
+        data = User.decode_auth_token(token)
+        if data is None:
+            return None
+        with primary():
+            user = db.session.get(User, data['id'])
+            if user is None:
+                return None
+            snapshot = snapshot_of(user)
+        identity_cache.put(token, snapshot, data['exp'])
+    # On a miss, hand over the row we just loaded so it is not fetched twice
+    return UserSnapshot(snapshot, user)
+
+def load_stream_identity(token):
+    """Return a UserSnapshot for an event stream token, or None if it is invalid.
+
+    Stream tokens are single use in practice (one per connection), so they
+    are not cached.
+    """
+    data = User.decode_stream_token(token)
+    user = db.session.get(User, data['id']) if data else None
+    return UserSnapshot(snapshot_of(user), user) if user else None
+
+def invalidate_user(user_id):
+    identity_cache.invalidate_user(user_id)
+
+def _collect_changed_users(session, queued):
+    # before_flush, while deleted rows still carry their ids
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            queued['users'].add(obj.id)
+        elif isinstance(obj, ProfileInfo) and obj.user_id is not None:
+            queued['users'].add(obj.user_id)
+
+def _invalidate_committed(users):
+    for user_id in users:
+        invalidate_user(user_id)
+
+changes = CommitQueue('identity', _invalidate_committed, users=set)
+
+def invalidate_on_commit(user_id, session=None):
+    """Drop the user's snapshot once the current transaction commits.
+
+    For bulk Query.update()/update() writes, which the flush hook cannot see.
+    """
+    changes.pending(session)['users'].add(user_id)
+
+def init_app(app):
+    app.config.setdefault('AUTH_CACHE_SIZE', 1024)
+    app.config.setdefault('AUTH_CACHE_TTL', 60)
+    identity_cache.max_size = app.config['AUTH_CACHE_SIZE']
+    identity_cache.ttl = app.config['AUTH_CACHE_TTL']
+    changes.listen(_collect_changed_users, 'before_flush')
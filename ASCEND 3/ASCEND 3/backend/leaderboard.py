@@ -0,0 +1,129 @@
+import time
+from bisect import bisect_left, insort
+from commit_queue import CommitQueue, RebuiltIndex
+from db_routing import primary
+from models import db, User
+
+# ==========================================
+# Points leaderboard
+# ==========================================
+# Users are kept in sorted arrays of (-points, user_id) keys, one global and
+# one per role, so top-N is a slice and "my rank" is a bisect instead of an
+# ORDER BY over the users table. Point changes are applied after commit:
+# ledger writes report the new balance through record_balance(), and ORM
+# inserts/updates/deletes of User are picked up by the flush hook. The arrays
+# are built on first use and again every LEADERBOARD_REBUILD_INTERVAL seconds
+# (see commit_queue.py).
+
+EXCLUDED_ROLES = ('admin',)
+GLOBAL = None # Board key for all roles
+
+class RankIndex(RebuiltIndex):
+    def __init__(self, rebuild_interval=300):
+        super().__init__(rebuild_interval)
+        self._boards = {} # role (or GLOBAL) -> sorted [(-points, user_id)]
+        self._users = {} # user_id -> (points, role)
+
+    def _ensure_built(self):
+        if not self._expired():
+            return
+        # One pass over users; every row is needed, so filter roles here rather than in SQL
+        users = {}
+        with primary():
+            for user_id, points, role in db.session.query(User.id, User.points, User.role):
+                if role not in EXCLUDED_ROLES:
+                    users[user_id] = (points or 0, role)
+        boards = {GLOBAL: sorted((-points, user_id) for user_id, (points, _) in users.items())}
+        for user_id, (points, role) in users.items():
+            boards.setdefault(role, []).append((-points, user_id))
+        for role, keys in boards.items():
+            if role is not GLOBAL:
+                keys.sort()
+        self._users, self._boards, self._built_at = users, boards, time.time()
+
+    def _remove(self, user_id):
+        entry = self._users.pop(user_id, None)
+        if entry is None:
+            return
+        points, role = entry
+        key = (-points, user_id)
+        for board in (self._boards[GLOBAL], self._boards.get(role, [])):
+            i = bisect_left(board, key)
+            if i < len(board) and board[i] == key:
+                del board[i]
+
+    def _insert(self, user_id, points, role):
+        self._users[user_id] = (points, role)
+        insort(self._boards.setdefault(GLOBAL, []), (-points, user_id))
+        insort(self._boards.setdefault(role, []), (-points, user_id))
+
+    def apply(self, balances, users, deleted):
+        """Apply committed changes: {id: points}, {id: (points, role)}, {ids}."""
+        with self._lock:
+            if self._built_at is None:
+                return # Not built yet; the first read loads everything
+            for user_id in deleted:
+                self._remove(user_id)
+            for user_id, (points, role) in users.items():
+                self._remove(user_id)
+                if role not in EXCLUDED_ROLES:
+                    self._insert(user_id, points or 0, role)
+            for user_id, points in balances.items():
+                entry = self._users.get(user_id)
+                if entry is not None and entry[0] != points:
+                    self._remove(user_id)
+                    self._insert(user_id, points, entry[1])
+
+    def top(self, limit, role=GLOBAL):
+        """[(rank, user_id, points)] for the first `limit` users."""
+        with self._lock:
+            self._ensure_built()
+            board = self._boards.get(role, [])
+            return [(self._rank(board, -key[0]), key[1], -key[0]) for key in board[:limit]]
+
+    def around(self, user_id, radius, role=GLOBAL):
+        """[(rank, user_id, points)] for `radius` users either side of user_id."""
+        with self._lock:
+            self._ensure_built()
+            entry = self._users.get(user_id)
+            board = self._boards.get(role, [])
+            if entry is None or (role is not GLOBAL and entry[1] != role):
+                return []
+            i = bisect_left(board, (-entry[0], user_id))
+            window = board[max(0, i - radius):i + radius + 1]
+            return [(self._rank(board, -key[0]), key[1], -key[0]) for key in window]
+
+    def rank(self, user_id, role=GLOBAL):
+        """(rank, points, board size) for a user, or None if they are not ranked."""
+        with self._lock:
+            self._ensure_built()
+            entry = self._users.get(user_id)
+            board = self._boards.get(role, [])
+            if entry is None or (role is not GLOBAL and entry[1] != role):
+                return None
+            return self._rank(board, entry[0]), entry[0], len(board)
+
+    @staticmethod
+    def _rank(board, points):
+        # Standard competition ranking: ties share a rank
+        return bisect_left(board, (-points, float('-inf'))) + 1
+
+rank_index = RankIndex()
+
+def _collect_changes(session, queued):
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, User):
+            queued['users'][obj.id] = (obj.points, obj.role)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            queued['deleted'].add(obj.id)
+
+changes = CommitQueue('leaderboard', rank_index.apply, balances=dict, users=dict, deleted=set)
+
+def record_balance(user_id, points, session=None):
+    """Queue a committed-on-success balance change from a bulk points write."""
+    changes.pending(session)['balances'][user_id] = points
+
+def init_app(app):
+    rank_index.configure(app, 'LEADERBOARD_REBUILD_INTERVAL')
+    changes.listen(_collect_changes)
@@ -0,0 +1,91 @@
+from collections import defaultdict
+from sqlalchemy import func
+from sqlalchemy.orm import configure_mappers, selectinload
+from models import User, Question, Reply, DiscussionThread, Roadmap, Experience, MentorshipRequest, Conversation
+
+# Backref attributes (Question.author, Reply.question, ...) only exist once the
+# mappers have been configured, so do it up-front before building the profiles.
+configure_mappers()
+
+# ==========================================
+# Loader Profiles
+# ==========================================
+# Named eager-loading option sets for the list endpoints. Each profile pulls the
+# related rows for a whole page in one extra SELECT ... IN per relationship, so
+# the number of statements no longer grows with the number of rows.
+
+PROFILES = {
+    # Question list with its author and the author's profile
+    'question_author': (
+        selectinload(Question.author).selectinload(User.profile_info),
+    ),
+    # Reply with its author, the author's profile and the parent question
+    'reply_author_question': (
+        selectinload(Reply.author).selectinload(User.profile_info),
+        selectinload(Reply.question),
+    ),
+    'thread_author': (
+        selectinload(DiscussionThread.author).selectinload(User.profile_info),
+    ),
+    'roadmap_creator': (
+        selectinload(Roadmap.creator).selectinload(User.profile_info),
+    ),
+    # Mentor card: user plus profile and stats (latest experience comes from latest_experiences)
+    'mentor_card': (
+        selectinload(User.profile_info),
+        selectinload(User.mentor_stats),
+    ),
+    # Leaderboard row: user plus profile for the display name
+    'user_card': (
+        selectinload(User.profile_info),
+    ),
+    'request_student': (
+        selectinload(MentorshipRequest.student).selectinload(User.profile_info),
+    ),
+    'request_mentor': (
+        selectinload(MentorshipRequest.mentor).selectinload(User.profile_info),
+    ),
+    # Add-on to request_mentor when the mentor's stats are rendered
+    'request_mentor_stats': (
+        selectinload(MentorshipRequest.mentor).selectinload(User.mentor_stats),
+    ),
+    # Inbox row: conversation partner with profile, plus the last message
+    'conversation_partner': (
+        selectinload(Conversation.partner).selectinload(User.profile_info),
+        selectinload(Conversation.last_message),
+    ),
+}
+
+def with_profile(query, name):
+    """Apply the named loader profile to a query."""
+    return query.options(*PROFILES[name])
+
+# ==========================================
+# Batched loaders for dynamic relationships
+# ==========================================
+# Relationships declared with lazy='dynamic' cannot be eager-loaded, so these
+# helpers fetch the children for a list of parents with a single IN query.
+
+def replies_by_question(question_ids):
+    """Return {question_id: [Reply, ...]} with reply authors and profiles loaded."""
+    grouped = defaultdict(list)
+    if not question_ids:
+        return grouped
+    replies = Reply.query.options(
+        selectinload(Reply.author).selectinload(User.profile_info)
+    ).filter(Reply.question_id.in_(question_ids)).order_by(Reply.id).all()
+    for r in replies:
+        grouped[r.question_id].append(r)
+    return grouped
+
+def latest_experiences(user_ids):
+    """Return {user_id: Experience} holding each user's most recent experience."""
+    if not user_ids:
+        return {}
+    latest_ids = Experience.query.with_entities(func.max(Experience.id)).filter(
+        Experience.user_id.in_(user_ids)
+    ).group_by(Experience.user_id)
+    experiences = Experience.query.options(selectinload(Experience.company)).filter(
+        Experience.id.in_(latest_ids.scalar_subquery())
+    ).all()
+    return {e.user_id: e for e in experiences}
@@ -0,0 +1,140 @@
+import os
+import time
+from flask import Blueprint, Response, current_app, g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import Pool, QueuePool
+
+# ==========================================
+# Prometheus metrics
+# ==========================================
+# Request latency per route (histogram), requests by status, requests in
+# flight, pool checkouts and the time spent waiting for a pooled connection,
+# identity/response cache hits and misses, and password hash time, exposed
+# in the Prometheus text format at /metrics.
+#
+# Under a multi-process server (gunicorn) start every worker with
+# PROMETHEUS_MULTIPROC_DIR pointing at one empty, writable directory. Each
+# worker then keeps its values in mmap'ed files there and a scrape of any
+# worker merges all of them; call mark_process_dead(worker.pid) from
+# gunicorn's child_exit hook so in-flight gauges forget dead workers.
+# gunicorn.conf.py does both. Without the directory, values are per process.
+# Every metric update is a locked float add (an mmap write in multi-process
+# mode); the hooks cost about 12 microseconds per request.
+#
+# Pool wait time is measured by timing Pool.connect() in a QueuePool subclass,
+# which init_app installs as the engines' poolclass, so it must run before
+# db.init_app. Other pool classes never wait and are not timed.
+
+HASH_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+WAIT_BUCKETS = (.0001, .0005, .001, .005, .01, .05, .1, .5, 1, 5)
+
+REQUEST_LATENCY = Histogram('ascend_http_request_duration_seconds', 'Request latency, body included',
+                            ['method', 'endpoint'])
+REQUESTS = Counter('ascend_http_requests', 'Requests served', ['method', 'endpoint', 'status'])
+IN_PROGRESS = Gauge('ascend_http_requests_in_progress', 'Requests being served', multiprocess_mode='livesum')
+POOL_CHECKOUTS = Counter('ascend_db_pool_checkouts', 'Connections checked out of the pool')
+POOL_WAIT = Histogram('ascend_db_pool_wait_seconds', 'Time spent getting a pooled connection',
+                      buckets=WAIT_BUCKETS)
+POOL_CHECKED_OUT = Gauge('ascend_db_pool_checked_out', 'Connections currently checked out',
+                         multiprocess_mode='livesum')
+CACHE_REQUESTS = Counter('ascend_cache_requests', 'Cache lookups', ['cache', 'result'])
+HASH_TIME = Histogram('ascend_password_hash_seconds', 'Password hash time, queueing included',
+                      ['operation'], buckets=HASH_BUCKETS)
+HASH_REJECTED = Counter('ascend_password_hash_rejected', 'Hash jobs rejected by a saturated pool')
+
+def cache_lookup(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+def mark_process_dead(pid):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
+
+# Request hooks
+
+_route_metrics = {} # (method, endpoint, status) -> (latency child, counter child)
+
+def _route_children(method, endpoint, status):
+    # labels() takes a lock and builds a key on every call; resolve once
+    children = _route_metrics.get((method, endpoint, status))
+    if children is None:
+        children = (REQUEST_LATENCY.labels(method, endpoint), REQUESTS.labels(method, endpoint, status))
+        _route_metrics[(method, endpoint, status)] = children
+    return children
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    IN_PROGRESS.inc()
+
+def _finish_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    req = request._get_current_object()
+    latency, requests = _route_children(req.method, req.endpoint or '<unmatched>', response.status_code)
+
+    # Streamed bodies are still being produced here, so observe at close
+    def close():
+        IN_PROGRESS.dec()
+        latency.observe(time.perf_counter() - started)
+        requests.inc()
+    response.call_on_close(close)
+    return response
+
+# Connection pool
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each connect() waited for a connection."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started)
+
+def _time_pool(app):
+    options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    if 'poolclass' in options or 'pool' in options or options.get('pool_size') == 0:
+        return # Pool chosen explicitly
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_dialect().get_pool_class(url) is QueuePool:
+        options['poolclass'] = TimedQueuePool
+
+def _checkout(dbapi_connection, connection_record, connection_proxy):
+    POOL_CHECKOUTS.inc()
+    POOL_CHECKED_OUT.inc()
+
+def _checkin(dbapi_connection, connection_record):
+    POOL_CHECKED_OUT.dec()
+
+# Exposition
+
+metrics = Blueprint('metrics', __name__)
+
+@metrics.route('/metrics')
+def get_metrics():
+    token = current_app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+def init_app(app):
+    app.config.setdefault('METRICS_ENABLED', True)
+    app.config.setdefault('METRICS_TOKEN', '')
+    if not app.config['METRICS_ENABLED']:
+        return
+    _time_pool(app)
+    if not event.contains(Pool, 'checkout', _checkout):
+        event.listen(Pool, 'checkout', _checkout)
+        event.listen(Pool, 'checkin', _checkin)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.register_blueprint(metrics)
@@ -0,0 +1,53 @@
+"""Add points ledger
+
+Revision ID: a2c8e4f19d36
+Revises: f3a9d61c0b74
+Create Date: 2026-10-18 17:05:38.114520
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2c8e4f19d36'
+down_revision = 'f3a9d61c0b74'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('points_transactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('balance_after', sa.Integer(), nullable=True),
+    sa.Column('reason', sa.String(length=32), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('points_transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_points_transactions_user_id_id', ['user_id', 'id'], unique=False)
+
+    with op.batch_alter_table('questions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('accepted_reply_id', sa.Integer(), nullable=True))
+
+    # Open the ledger with each user's current balance so it sums to users.points
+    op.execute("""
+        INSERT INTO points_transactions (user_id, amount, balance_after, reason, created_at)
+        SELECT id, points, points, 'opening_balance', CURRENT_TIMESTAMP FROM users
+        WHERE points IS NOT NULL AND points != 0
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('questions', schema=None) as batch_op:
+        batch_op.drop_column('accepted_reply_id')
+
+    with op.batch_alter_table('points_transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_points_transactions_user_id_id')
+
+    op.drop_table('points_transactions')
@@ -0,0 +1,83 @@
+"""Add indexes for hot filters
+
+Revision ID: a7c41e9d2b53
+Revises: 3f0675fa2933
+Create Date: 2026-10-18 09:12:40.118274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c41e9d2b53'
+down_revision = '3f0675fa2933'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    # messages was dropped in 3f0675fa2933 and is recreated by db.create_all()
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_role'), ['role'], unique=False)
+
+    with op.batch_alter_table('skills', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_skills_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('questions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_questions_created_at'), ['created_at'], unique=False)
+        batch_op.create_index('ix_questions_user_id_created_at', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_questions_is_urgent_bounty_created_at', ['is_urgent', 'bounty', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('replies', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_replies_question_id'), ['question_id'], unique=False)
+
+    with op.batch_alter_table('discussion_threads', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_discussion_threads_created_at'), ['created_at'], unique=False)
+
+    with op.batch_alter_table('experiences', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_experiences_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('mentorship_requests', schema=None) as batch_op:
+        batch_op.create_index('ix_mentorship_requests_mentor_id_status', ['mentor_id', 'status'], unique=False)
+        batch_op.create_index('ix_mentorship_requests_student_id_status', ['student_id', 'status'], unique=False)
+
+    if _has_table('messages'):
+        with op.batch_alter_table('messages', schema=None) as batch_op:
+            batch_op.create_index('ix_messages_sender_id_recipient_id_created_at', ['sender_id', 'recipient_id', 'created_at'], unique=False)
+            batch_op.create_index('ix_messages_recipient_id_is_read', ['recipient_id', 'is_read'], unique=False)
+
+
+def downgrade():
+    if _has_table('messages'):
+        with op.batch_alter_table('messages', schema=None) as batch_op:
+            batch_op.drop_index('ix_messages_recipient_id_is_read')
+            batch_op.drop_index('ix_messages_sender_id_recipient_id_created_at')
+
+    with op.batch_alter_table('mentorship_requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_mentorship_requests_student_id_status')
+        batch_op.drop_index('ix_mentorship_requests_mentor_id_status')
+
+    with op.batch_alter_table('experiences', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_experiences_user_id'))
+
+    with op.batch_alter_table('discussion_threads', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_discussion_threads_created_at'))
+
+    with op.batch_alter_table('replies', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_replies_question_id'))
+
+    with op.batch_alter_table('questions', schema=None) as batch_op:
+        batch_op.drop_index('ix_questions_is_urgent_bounty_created_at')
+        batch_op.drop_index('ix_questions_user_id_created_at')
+        batch_op.drop_index(batch_op.f('ix_questions_created_at'))
+
+    with op.batch_alter_table('skills', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_skills_user_id'))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_role'))
@@ -0,0 +1,57 @@
+"""Add conversations summary
+
+Revision ID: b18e5f07c3d9
+Revises: a7c41e9d2b53
+Create Date: 2026-10-18 11:03:27.540912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b18e5f07c3d9'
+down_revision = 'a7c41e9d2b53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('conversations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('partner_id', sa.Integer(), nullable=False),
+    sa.Column('last_message_id', sa.Integer(), nullable=True),
+    sa.Column('last_message_at', sa.DateTime(), nullable=True),
+    sa.Column('unread_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['last_message_id'], ['messages.id'], ),
+    sa.ForeignKeyConstraint(['partner_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'partner_id', name='uq_conversations_user_id_partner_id')
+    )
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.create_index('ix_conversations_user_id_last_message_at', ['user_id', 'last_message_at'], unique=False)
+
+    # Backfill one row per (user, partner) from the existing message history
+    if sa.inspect(op.get_bind()).has_table('messages'):
+        op.execute("""
+            INSERT INTO conversations (user_id, partner_id, last_message_id, last_message_at, unread_count)
+            SELECT user_id, partner_id, MAX(id), MAX(created_at), SUM(unread)
+            FROM (
+                SELECT sender_id AS user_id, recipient_id AS partner_id, id, created_at, 0 AS unread
+                FROM messages
+                UNION ALL
+                SELECT recipient_id AS user_id, sender_id AS partner_id, id, created_at,
+                       CASE WHEN is_read THEN 0 ELSE 1 END AS unread
+                FROM messages
+            ) AS sides
+            GROUP BY user_id, partner_id
+        """)
+
+
+def downgrade():
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_index('ix_conversations_user_id_last_message_at')
+
+    op.drop_table('conversations')
@@ -0,0 +1,35 @@
+"""Add unread messages counter
+
+Revision ID: c5d2a8e61f47
+Revises: b18e5f07c3d9
+Create Date: 2026-10-18 12:20:05.734190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d2a8e61f47'
+down_revision = 'b18e5f07c3d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('unread_messages', sa.Integer(), server_default='0', nullable=True))
+
+    # Backfill from the current message state
+    if sa.inspect(op.get_bind()).has_table('messages'):
+        op.execute("""
+            UPDATE users SET unread_messages = (
+                SELECT COUNT(*) FROM messages
+                WHERE messages.recipient_id = users.id AND NOT messages.is_read
+            )
+        """)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('unread_messages')
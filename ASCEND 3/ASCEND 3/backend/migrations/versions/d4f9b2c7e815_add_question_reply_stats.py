@@ -0,0 +1,42 @@
+"""Add question reply stats
+
+Revision ID: d4f9b2c7e815
+Revises: c5d2a8e61f47
+Create Date: 2026-10-18 13:41:52.906318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f9b2c7e815'
+down_revision = 'c5d2a8e61f47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('questions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reply_count', sa.Integer(), server_default='0', nullable=True))
+        batch_op.add_column(sa.Column('is_answered', sa.Boolean(), server_default=sa.false(), nullable=True))
+        batch_op.add_column(sa.Column('last_reply_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_questions_is_answered_is_urgent_created_at', ['is_answered', 'is_urgent', 'created_at'], unique=False)
+        batch_op.create_index('ix_questions_is_answered_is_urgent_bounty', ['is_answered', 'is_urgent', 'bounty', 'created_at'], unique=False)
+
+    # Backfill from existing replies
+    op.execute("""
+        UPDATE questions SET
+            reply_count = (SELECT COUNT(*) FROM replies WHERE replies.question_id = questions.id),
+            last_reply_at = (SELECT MAX(created_at) FROM replies WHERE replies.question_id = questions.id),
+            is_answered = EXISTS (SELECT 1 FROM replies WHERE replies.question_id = questions.id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('questions', schema=None) as batch_op:
+        batch_op.drop_index('ix_questions_is_answered_is_urgent_bounty')
+        batch_op.drop_index('ix_questions_is_answered_is_urgent_created_at')
+        batch_op.drop_column('last_reply_at')
+        batch_op.drop_column('is_answered')
+        batch_op.drop_column('reply_count')
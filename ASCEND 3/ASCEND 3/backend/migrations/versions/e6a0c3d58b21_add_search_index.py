@@ -0,0 +1,45 @@
+"""Add FTS5 search index
+
+Revision ID: e6a0c3d58b21
+Revises: d4f9b2c7e815
+Create Date: 2026-10-18 15:02:44.617093
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a0c3d58b21'
+down_revision = 'd4f9b2c7e815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 only exists on SQLite; other databases use the ILIKE fallback in search.py
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            kind UNINDEXED, ref_id UNINDEXED, parent_id UNINDEXED, title, body,
+            tokenize = 'porter unicode61'
+        )
+    """)
+    op.execute("""
+        INSERT INTO search_index (kind, ref_id, parent_id, title, body)
+        SELECT 'question', id, NULL, title, content FROM questions
+        UNION ALL
+        SELECT 'reply', id, question_id, '', content FROM replies
+        UNION ALL
+        SELECT 'roadmap', id, NULL, title, COALESCE(description, '') || char(10) || COALESCE(steps, '') FROM roadmaps
+        UNION ALL
+        SELECT 'thread', id, NULL, title, '' FROM discussion_threads
+    """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TABLE IF EXISTS search_index")
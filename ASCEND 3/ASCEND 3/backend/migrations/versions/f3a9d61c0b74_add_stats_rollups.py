@@ -0,0 +1,105 @@
+"""Add stats rollups
+
+Revision ID: f3a9d61c0b74
+Revises: e6a0c3d58b21
+Create Date: 2026-10-18 16:20:13.508221
+
+"""
+from collections import defaultdict
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9d61c0b74'
+down_revision = 'e6a0c3d58b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('mentor_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('replies_given', sa.Integer(), nullable=False),
+    sa.Column('questions_answered', sa.Integer(), nullable=False),
+    sa.Column('first_answers', sa.Integer(), nullable=False),
+    sa.Column('first_answer_seconds', sa.Integer(), nullable=False),
+    sa.Column('accepted_mentorships', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('roadmap_saves',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('roadmap_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['roadmap_id'], ['roadmaps.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('roadmap_id', 'user_id', name='uq_roadmap_saves_roadmap_id_user_id')
+    )
+    op.create_table('thread_likes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('thread_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['thread_id'], ['discussion_threads.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('thread_id', 'user_id', name='uq_thread_likes_thread_id_user_id')
+    )
+    with op.batch_alter_table('roadmaps', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('save_count', sa.Integer(), server_default='0', nullable=True))
+
+    with op.batch_alter_table('discussion_threads', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('like_count', sa.Integer(), server_default='0', nullable=True))
+
+    # Backfill mentor_stats from existing replies and mentorships
+    bind = op.get_bind()
+    replies = sa.table('replies', sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+                       sa.column('question_id', sa.Integer), sa.column('created_at', sa.DateTime))
+    questions = sa.table('questions', sa.column('id', sa.Integer), sa.column('created_at', sa.DateTime))
+    requests = sa.table('mentorship_requests', sa.column('id', sa.Integer), sa.column('mentor_id', sa.Integer),
+                        sa.column('status', sa.String))
+    stats = defaultdict(lambda: {'replies_given': 0, 'questions_answered': 0, 'first_answers': 0,
+                                 'first_answer_seconds': 0, 'accepted_mentorships': 0})
+
+    for user_id, count, distinct in bind.execute(sa.select(
+        replies.c.user_id, sa.func.count(replies.c.id), sa.func.count(sa.distinct(replies.c.question_id))
+    ).where(replies.c.user_id.isnot(None)).group_by(replies.c.user_id)):
+        stats[user_id]['replies_given'] = count
+        stats[user_id]['questions_answered'] = distinct
+
+    first_ids = sa.select(sa.func.min(replies.c.id)).group_by(replies.c.question_id).scalar_subquery()
+    for user_id, replied_at, asked_at in bind.execute(sa.select(
+        replies.c.user_id, replies.c.created_at, questions.c.created_at
+    ).join(questions, replies.c.question_id == questions.c.id).where(
+        replies.c.id.in_(first_ids), replies.c.user_id.isnot(None)
+    )):
+        stats[user_id]['first_answers'] += 1
+        if replied_at and asked_at:
+            stats[user_id]['first_answer_seconds'] += max(0, int((replied_at - asked_at).total_seconds()))
+
+    for mentor_id, count in bind.execute(sa.select(
+        requests.c.mentor_id, sa.func.count(requests.c.id)
+    ).where(requests.c.status == 'accepted', requests.c.mentor_id.isnot(None)).group_by(requests.c.mentor_id)):
+        stats[mentor_id]['accepted_mentorships'] = count
+
+    if stats:
+        mentor_stats = sa.table('mentor_stats', *[sa.column(name) for name in (
+            'user_id', 'replies_given', 'questions_answered', 'first_answers',
+            'first_answer_seconds', 'accepted_mentorships')])
+        op.bulk_insert(mentor_stats, [{'user_id': user_id, **row} for user_id, row in stats.items()])
+
+
+def downgrade():
+    with op.batch_alter_table('discussion_threads', schema=None) as batch_op:
+        batch_op.drop_column('like_count')
+
+    with op.batch_alter_table('roadmaps', schema=None) as batch_op:
+        batch_op.drop_column('save_count')
+
+    op.drop_table('thread_likes')
+    op.drop_table('roadmap_saves')
+    op.drop_table('mentor_stats')
@@ -1,9 +1,19 @@
+import math
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+def upsert(model):
+    """INSERT for `model` that supports .on_conflict_do_update() (SQLite, PostgreSQL)."""
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model.__table__)
 
 # ==========================================
 # User Module
@@ -15,9 +25,10 @@ class User(UserMixin, db.Model):
     username = db.Column(db.String(64), index=True, unique=True, nullable=False)
     email = db.Column(db.String(120), index=True, unique=True, nullable=False)
     password_hash = db.Column(db.String(128))
-    role = db.Column(db.String(20), default='student') # 'student', 'alumni', 'admin'
+    role = db.Column(db.String(20), index=True, default='student') # 'student', 'alumni', 'admin'
     is_verified = db.Column(db.Boolean, default=False) # For mentors
     points = db.Column(db.Integer, default=100) # Gamification points
+    unread_messages = db.Column(db.Integer, default=0) # Maintained by send/read, see rebuild_unread_counts
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
@@ -29,9 +40,12 @@ class User(UserMixin, db.Model):
     experiences = db.relationship('Experience', backref='user', lazy='dynamic')
     messages_sent = db.relationship('Message', foreign_keys='Message.sender_id', backref='sender', lazy='dynamic')
     messages_received = db.relationship('Message', foreign_keys='Message.recipient_id', backref='recipient', lazy='dynamic')
+    mentor_stats = db.relationship('MentorStats', uselist=False)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        # Inline hashing for scripts; request handlers go through hashing.py
+        from flask import current_app
+        self.password_hash = generate_password_hash(password, method=current_app.config.get('PASSWORD_HASH_METHOD', 'scrypt'))
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -46,20 +60,80 @@ class User(UserMixin, db.Model):
             algorithm='HS256'
         )
 
+    def generate_stream_token(self, expiration=60):
+        """Short-lived token that only opens the event stream.
+
+        EventSource cannot send headers, so this goes in the URL (and in access
+        logs) instead of the bearer token.
+        """
+        from flask import current_app
+        import jwt
+        import time
+        return jwt.encode(
+            {'id': self.id, 'exp': time.time() + expiration, 'scope': 'events'},
+            current_app.config['SECRET_KEY'],
+            algorithm='HS256'
+        )
+
     @staticmethod
-    def verify_auth_token(token):
+    def _decode_token(token):
         from flask import current_app
         import jwt
         try:
-            data = jwt.decode(
+            return jwt.decode(
                 token,
                 current_app.config['SECRET_KEY'],
                 algorithms=['HS256']
             )
         except:
             return None
+
+    @staticmethod
+    def decode_auth_token(token):
+        data = User._decode_token(token)
+        # Scoped tokens (generate_stream_token) are not bearer tokens
+        if data is None or 'scope' in data:
+            return None
+        return data
+
+    @staticmethod
+    def decode_stream_token(token):
+        data = User._decode_token(token)
+        if data is None or data.get('scope') != 'events':
+            return None
+        return data
+
+    @staticmethod
+    def verify_auth_token(token):
+        data = User.decode_auth_token(token)
+        if data is None:
+            return None
         return User.query.get(data['id'])
 
+    @property
+    def display_name(self):
+        return self.profile_info.full_name if self.profile_info and self.profile_info.full_name else self.username
+
+    @staticmethod
+    def rebuild_unread_counts():
+        """Recompute users.unread_messages and conversation unread counts from Message."""
+        unread = db.session.query(Message.recipient_id, db.func.count(Message.id)).filter(
+            Message.is_read == False
+        ).group_by(Message.recipient_id).all()
+        User.query.update({'unread_messages': 0}, synchronize_session=False)
+        for user_id, count in unread:
+            User.query.filter_by(id=user_id).update({'unread_messages': count}, synchronize_session=False)
+
+        per_partner = db.session.query(Message.recipient_id, Message.sender_id, db.func.count(Message.id)).filter(
+            Message.is_read == False
+        ).group_by(Message.recipient_id, Message.sender_id).all()
+        Conversation.query.update({'unread_count': 0}, synchronize_session=False)
+        for user_id, partner_id, count in per_partner:
+            Conversation.query.filter_by(user_id=user_id, partner_id=partner_id).update(
+                {'unread_count': count}, synchronize_session=False)
+        db.session.commit()
+        return len(unread)
+
     def __repr__(self):
         return f'<User {self.username}>'
 
@@ -67,27 +141,51 @@ class Skill(db.Model):
     __tablename__ = 'skills'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(64), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
 
 class Question(db.Model):
     __tablename__ = 'questions'
+    __table_args__ = (
+        db.Index('ix_questions_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_questions_is_urgent_bounty_created_at', 'is_urgent', 'bounty', 'created_at', 'id'),
+        # Unanswered queues for the mentor dashboard
+        db.Index('ix_questions_is_answered_is_urgent_created_at', 'is_answered', 'is_urgent', 'created_at'),
+        db.Index('ix_questions_is_answered_is_urgent_bounty', 'is_answered', 'is_urgent', 'bounty', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(256), nullable=False)
     content = db.Column(db.Text, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     is_urgent = db.Column(db.Boolean, default=False)
     bounty = db.Column(db.Integer, default=0)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, index=True, default=datetime.utcnow)
+    # Denormalized from replies, maintained by reply_question
+    reply_count = db.Column(db.Integer, default=0)
+    is_answered = db.Column(db.Boolean, default=False)
+    last_reply_at = db.Column(db.DateTime)
+    # Set once when the author accepts an answer; the bounty goes to its author.
+    # Deliberately not a ForeignKey: a second questions<->replies path would make
+    # every Reply/Question join ambiguous.
+    accepted_reply_id = db.Column(db.Integer)
     
     # Relationships
     replies = db.relationship('Reply', backref='question', lazy='dynamic')
 
+    @staticmethod
+    def record_reply(reply):
+        """Bump the denormalized reply stats for a newly flushed reply."""
+        Question.query.filter_by(id=reply.question_id).update({
+            'reply_count': db.func.coalesce(Question.reply_count, 0) + 1,
+            'is_answered': True,
+            'last_reply_at': reply.created_at
+        }, synchronize_session=False)
+
 class Reply(db.Model):
     __tablename__ = 'replies'
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
-    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'))
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class DiscussionThread(db.Model):
@@ -96,6 +194,18 @@ class DiscussionThread(db.Model):
     title = db.Column(db.String(256), nullable=False)
     category = db.Column(db.String(64))
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, index=True, default=datetime.utcnow)
+    # Maintained by like/unlike, see MentorStats.rebuild
+    like_count = db.Column(db.Integer, default=0)
+
+class ThreadLike(db.Model):
+    __tablename__ = 'thread_likes'
+    __table_args__ = (
+        db.UniqueConstraint('thread_id', 'user_id', name='uq_thread_likes_thread_id_user_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    thread_id = db.Column(db.Integer, db.ForeignKey('discussion_threads.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class ProfileInfo(db.Model):
@@ -143,14 +253,26 @@ class Roadmap(db.Model):
     steps = db.Column(db.Text) # Storing as JSON string or delineated text for simplicity
     career_path_id = db.Column(db.Integer, db.ForeignKey('career_paths.id'))
     creator_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    # Maintained by save/unsave, see MentorStats.rebuild
+    save_count = db.Column(db.Integer, default=0)
     
     # Relationships
     creator = db.relationship('User', backref='roadmaps')
 
+class RoadmapSave(db.Model):
+    __tablename__ = 'roadmap_saves'
+    __table_args__ = (
+        db.UniqueConstraint('roadmap_id', 'user_id', name='uq_roadmap_saves_roadmap_id_user_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    roadmap_id = db.Column(db.Integer, db.ForeignKey('roadmaps.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class Experience(db.Model):
     __tablename__ = 'experiences'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'))
     role = db.Column(db.String(128), nullable=False)
     start_date = db.Column(db.Date)
@@ -159,6 +281,10 @@ class Experience(db.Model):
 
 class MentorshipRequest(db.Model):
     __tablename__ = 'mentorship_requests'
+    __table_args__ = (
+        db.Index('ix_mentorship_requests_mentor_id_status', 'mentor_id', 'status'),
+        db.Index('ix_mentorship_requests_student_id_status', 'student_id', 'status'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     mentor_id = db.Column(db.Integer, db.ForeignKey('users.id'))
@@ -172,9 +298,189 @@ class MentorshipRequest(db.Model):
 
 class Message(db.Model):
     __tablename__ = 'messages'
+    __table_args__ = (
+        db.Index('ix_messages_sender_id_recipient_id_created_at', 'sender_id', 'recipient_id', 'created_at'),
+        db.Index('ix_messages_recipient_id_is_read', 'recipient_id', 'is_read'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     recipient_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_read = db.Column(db.Boolean, default=False)
+
+class Conversation(db.Model):
+    """Per-user summary of a conversation, maintained on every send/read."""
+    __tablename__ = 'conversations'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'partner_id', name='uq_conversations_user_id_partner_id'),
+        db.Index('ix_conversations_user_id_last_message_at', 'user_id', 'last_message_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    partner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    last_message_id = db.Column(db.Integer, db.ForeignKey('messages.id'))
+    last_message_at = db.Column(db.DateTime)
+    unread_count = db.Column(db.Integer, default=0, nullable=False)
+
+    # Relationships
+    partner = db.relationship('User', foreign_keys=[partner_id])
+    last_message = db.relationship('Message')
+
+    @staticmethod
+    def record_message(msg):
+        """Bump both sides of the conversation for a newly flushed message.
+
+        One upsert per side, so two concurrent first messages cannot both
+        insert the same summary row.
+        """
+        statement = upsert(Conversation)
+        statement = statement.on_conflict_do_update(
+            index_elements=['user_id', 'partner_id'],
+            set_={
+                'last_message_id': statement.excluded.last_message_id,
+                'last_message_at': statement.excluded.last_message_at,
+                'unread_count': Conversation.unread_count + statement.excluded.unread_count
+            }
+        )
+        db.session.execute(statement, [
+            {'user_id': msg.sender_id, 'partner_id': msg.recipient_id, 'last_message_id': msg.id,
+             'last_message_at': msg.created_at, 'unread_count': 0},
+            {'user_id': msg.recipient_id, 'partner_id': msg.sender_id, 'last_message_id': msg.id,
+             'last_message_at': msg.created_at, 'unread_count': 1},
+        ])
+
+    @staticmethod
+    def mark_read(user_id, partner_id):
+        Conversation.query.filter_by(user_id=user_id, partner_id=partner_id).update(
+            {'unread_count': 0}, synchronize_session=False)
+
+# ==========================================
+# Stats Module
+# ==========================================
+
+class MentorStats(db.Model):
+    """Per-user rollup of mentoring activity, bumped on every reply and accept.
+
+    The write paths keep it current; MentorStats.rebuild() recomputes it (and
+    the roadmap save / thread like counters) from the source tables and is run
+    periodically through `flask rebuild-stats` to compact any drift.
+    """
+    __tablename__ = 'mentor_stats'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    replies_given = db.Column(db.Integer, default=0, nullable=False)
+    questions_answered = db.Column(db.Integer, default=0, nullable=False) # Distinct questions
+    first_answers = db.Column(db.Integer, default=0, nullable=False) # Questions this user answered first
+    first_answer_seconds = db.Column(db.Integer, default=0, nullable=False) # Total time to those first answers
+    accepted_mentorships = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Trust score weights (sum to 100) and the counts at which each part is ~63% saturated
+    TRUST_REPLIES = (40, 10)
+    TRUST_MENTORSHIPS = (40, 3)
+    TRUST_RESPONSIVENESS = (20, 24) # Full marks for instant answers, half after 24 hours
+
+    @property
+    def avg_response_hours(self):
+        if not self.first_answers:
+            return None
+        return self.first_answer_seconds / self.first_answers / 3600
+
+    @property
+    def trust_score(self):
+        weight, scale = self.TRUST_REPLIES
+        score = weight * (1 - math.exp(-self.replies_given / scale))
+        weight, scale = self.TRUST_MENTORSHIPS
+        score += weight * (1 - math.exp(-self.accepted_mentorships / scale))
+        if self.first_answers:
+            weight, scale = self.TRUST_RESPONSIVENESS
+            score += weight / (1 + self.avg_response_hours / scale)
+        return round(score)
+
+    @staticmethod
+    def _bump(user_id, **deltas):
+        # One statement, so two first bumps for the same user can't both insert
+        now = datetime.utcnow()
+        db.session.execute(
+            upsert(MentorStats).values(user_id=user_id, updated_at=now, **deltas).on_conflict_do_update(
+                index_elements=['user_id'],
+                set_={**{name: getattr(MentorStats, name) + delta for name, delta in deltas.items()},
+                      'updated_at': now}
+            )
+        )
+
+    @staticmethod
+    def record_reply(reply, question, new_question):
+        """Bump the replier's stats for a newly flushed reply.
+
+        Call before Question.record_reply, while question.is_answered still
+        tells whether this is the first answer.
+        """
+        deltas = {'replies_given': 1, 'questions_answered': 1 if new_question else 0}
+        if not question.is_answered:
+            deltas['first_answers'] = 1
+            deltas['first_answer_seconds'] = max(0, int((reply.created_at - question.created_at).total_seconds()))
+        MentorStats._bump(reply.user_id, **deltas)
+
+    @staticmethod
+    def record_mentorship(mentor_id, delta=1):
+        """Count a mentorship that became accepted (delta=-1 when it stops being so)."""
+        MentorStats._bump(mentor_id, accepted_mentorships=delta)
+
+    @staticmethod
+    def rebuild():
+        """Recompute every rollup from the source tables."""
+        stats = {}
+        def row(user_id):
+            if user_id not in stats:
+                stats[user_id] = MentorStats(user_id=user_id, replies_given=0, questions_answered=0,
+                                             first_answers=0, first_answer_seconds=0, accepted_mentorships=0)
+            return stats[user_id]
+
+        for user_id, replies, questions in db.session.query(
+            Reply.user_id, db.func.count(Reply.id), db.func.count(db.distinct(Reply.question_id))
+        ).group_by(Reply.user_id):
+            row(user_id).replies_given = replies
+            row(user_id).questions_answered = questions
+
+        first_reply_ids = db.session.query(db.func.min(Reply.id)).group_by(Reply.question_id).scalar_subquery()
+        for user_id, replied_at, asked_at in db.session.query(
+            Reply.user_id, Reply.created_at, Question.created_at
+        ).join(Question, Reply.question_id == Question.id).filter(Reply.id.in_(first_reply_ids)):
+            row(user_id).first_answers += 1
+            row(user_id).first_answer_seconds += max(0, int((replied_at - asked_at).total_seconds()))
+
+        for mentor_id, count in db.session.query(
+            MentorshipRequest.mentor_id, db.func.count(MentorshipRequest.id)
+        ).filter(MentorshipRequest.status == 'accepted').group_by(MentorshipRequest.mentor_id):
+            row(mentor_id).accepted_mentorships = count
+
+        MentorStats.query.delete()
+        db.session.add_all(stats.values())
+
+        saves = db.session.query(db.func.count(RoadmapSave.id)).filter(
+            RoadmapSave.roadmap_id == Roadmap.id).scalar_subquery()
+        Roadmap.query.update({'save_count': saves}, synchronize_session=False)
+        likes = db.session.query(db.func.count(ThreadLike.id)).filter(
+            ThreadLike.thread_id == DiscussionThread.id).scalar_subquery()
+        DiscussionThread.query.update({'like_count': likes}, synchronize_session=False)
+        db.session.commit()
+        return len(stats)
+
+# ==========================================
+# Points Module
+# ==========================================
+
+class PointsTransaction(db.Model):
+    """Append-only ledger of point movements; users.points is its cached sum."""
+    __tablename__ = 'points_transactions'
+    __table_args__ = (
+        db.Index('ix_points_transactions_user_id_id', 'user_id', 'id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    amount = db.Column(db.Integer, nullable=False) # Signed: credits > 0, debits < 0
+    balance_after = db.Column(db.Integer)
+    reason = db.Column(db.String(32), nullable=False) # opening_balance, bounty, bounty_award, ...
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,203 @@
+import base64
+import json
+from datetime import datetime
+from itertools import islice
+from flask import Response, current_app, request, jsonify, stream_with_context
+from sqlalchemy import and_, or_, false, true
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+STREAM_BATCH = 500 # Rows fetched (and eager-loaded) per round trip when streaming
+NDJSON = 'application/x-ndjson'
+
+# ==========================================
+# Keyset (cursor) pagination
+# ==========================================
+# A sort order is a list of (column, 'asc' | 'desc') pairs ending in a unique
+# column (the primary key). The cursor is the sort-key tuple of the last row
+# returned, so every page is a range seek instead of an OFFSET scan.
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor, order):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(order):
+        raise ValueError('Invalid cursor')
+    return [_decode_value(value, column) for value, (column, _) in zip(values, order)]
+
+def _decode_value(value, column):
+    """Check one cursor value against its column's type; the cursor is client input."""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = None
+    if python_type is datetime:
+        if not isinstance(value, str):
+            raise ValueError('Invalid cursor')
+        return datetime.fromisoformat(value)
+    if python_type is bool:
+        valid = isinstance(value, bool) or value in (0, 1)
+    elif python_type is int:
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    elif python_type is float:
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif python_type is str:
+        valid = isinstance(value, str)
+    else:
+        valid = isinstance(value, (str, int, float))
+    if not valid:
+        raise ValueError('Invalid cursor')
+    return value
+
+def _after(column, direction, value):
+    """Rows strictly after `value` on one column (SQLite sorts NULLs lowest)."""
+    if isinstance(value, bool):
+        # SQLAlchemy refuses < / > against True/False literals
+        value = int(value)
+    if direction == 'desc':
+        if value is None:
+            return false()
+        return or_(column < value, column.is_(None))
+    if value is None:
+        return column.isnot(None)
+    return column > value
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+def keyset_filter(order, values):
+    """(a, b, id) > (va, vb, vid) expanded into OR-of-prefixes for mixed directions."""
+    clauses = []
+    for i, (column, direction) in enumerate(order):
+        prefix = [_equal(c, v) for (c, _), v in zip(order[:i], values[:i])]
+        clauses.append(and_(*prefix, _after(column, direction, values[i])))
+    return or_(*clauses) if clauses else true()
+
+def order_clauses(order):
+    return [column.desc() if direction == 'desc' else column.asc() for column, direction in order]
+
+class Page:
+    def __init__(self, items, next_cursor, paginated, query=None):
+        self._items = items
+        self._query = query
+        self.next_cursor = next_cursor
+        self.paginated = paginated
+
+    @property
+    def items(self):
+        # Unpaginated pages keep the query so stream() can fetch it in batches
+        if self._items is None:
+            self._items = self._query.all()
+        return self._items
+
+    def response(self, data):
+        """Plain list for legacy callers, envelope with next_cursor when paginating."""
+        if not self.paginated:
+            return jsonify(data)
+        return jsonify({'items': data, 'next_cursor': self.next_cursor})
+
+    def _batches(self):
+        if self._items is not None or self._query is None:
+            yield self.items
+            return
+        rows = iter(self._query.yield_per(STREAM_BATCH))
+        while True:
+            batch = list(islice(rows, STREAM_BATCH))
+            if not batch:
+                return
+            yield batch
+
+    def stream(self, serialize):
+        """Like response(), but writes items while the rows are still being fetched.
+
+        `serialize` turns a batch of rows into a list of dicts, so per-batch
+        loaders (replies_by_question, ...) still run once per batch. Unpaginated
+        results are read STREAM_BATCH rows at a time, so memory stays flat no
+        matter how many rows there are. Clients sending Accept: application/x-ndjson
+        get one JSON object per line, with the cursor in an X-Next-Cursor header.
+        """
+        json_provider = current_app.json
+
+        def dumps(obj):
+            # Same encoder as jsonify, with its compact separators
+            return json_provider.dumps(obj, separators=(',', ':'))
+
+        ndjson = request.accept_mimetypes.best_match([NDJSON, 'application/json']) == NDJSON
+
+        def generate():
+            if not ndjson:
+                yield '{"items":[' if self.paginated else '['
+            first = True
+            for batch in self._batches():
+                for item in serialize(batch):
+                    if ndjson:
+                        yield dumps(item) + '\n'
+                    else:
+                        yield dumps(item) if first else ',' + dumps(item)
+                    first = False
+            if not ndjson:
+                yield '],"next_cursor":%s}' % dumps(self.next_cursor) if self.paginated else ']'
+
+        response = Response(stream_with_context(generate()), mimetype=NDJSON if ndjson else 'application/json')
+        if ndjson and self.next_cursor:
+            response.headers['X-Next-Cursor'] = self.next_cursor
+        response.vary.add('Accept')
+        return response
+
+def paginate(query, order):
+    """Apply `order` and the request's `limit`/`cursor` params to `query`.
+
+    Without either param the full ordered result is returned, as before.
+    Raises ValueError on a malformed limit or cursor.
+    """
+    limit_arg = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    query = query.order_by(*order_clauses(order))
+    if limit_arg is None and cursor is None:
+        return Page(None, None, False, query)
+
+    try:
+        limit = int(limit_arg) if limit_arg is not None else DEFAULT_LIMIT
+    except ValueError:
+        raise ValueError('Invalid limit')
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    if cursor:
+        query = query.filter(keyset_filter(order, decode_cursor(cursor, order)))
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column, _ in order])
+    return Page(rows, next_cursor, True)
+
+def offset_args():
+    """(limit, offset) for result sets ranked by score rather than a sort key.
+
+    The cursor is still opaque to clients; it just encodes the next offset.
+    """
+    try:
+        limit = int(request.args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError('Invalid limit')
+    limit = max(1, min(limit, MAX_LIMIT))
+    offset = 0
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (ValueError, TypeError):
+            raise ValueError('Invalid cursor')
+        if not isinstance(values, list) or len(values) != 1 or type(values[0]) is not int:
+            raise ValueError('Invalid cursor')
+        offset = values[0]
+    return limit, max(offset, 0)
@@ -0,0 +1,80 @@
+from sqlalchemy import event, func, insert, update
+from models import db, User, PointsTransaction
+from identity import invalidate_on_commit, identity_cache
+from leaderboard import record_balance, rank_index
+
+# ==========================================
+# Points ledger
+# ==========================================
+# Every point movement is an append-only PointsTransaction row and
+# users.points is the cached balance. Debits are one conditional UPDATE
+# (points = points - :amount WHERE points >= :amount), so concurrent spends
+# can never overdraw or lose an update, and no table lock is taken. The
+# ledger row is written in the same transaction as the balance change;
+# rebuild_balances() recomputes users.points from the ledger.
+
+class InsufficientPoints(Exception):
+    pass
+
+def _record(user_id, amount, balance, reason, question_id):
+    db.session.add(PointsTransaction(
+        user_id=user_id,
+        amount=amount,
+        balance_after=balance,
+        reason=reason,
+        question_id=question_id
+    ))
+    invalidate_on_commit(user_id)
+    record_balance(user_id, balance)
+
+def debit(user_id, amount, reason, question_id=None):
+    """Take `amount` points atomically; returns the new balance.
+
+    Raises InsufficientPoints (and changes nothing) if the balance is too low.
+    """
+    balance = db.session.execute(
+        update(User)
+        .where(User.id == user_id, User.points >= amount)
+        .values(points=User.points - amount)
+        .returning(User.points)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if balance is None:
+        raise InsufficientPoints()
+    _record(user_id, -amount, balance, reason, question_id)
+    return balance
+
+def credit(user_id, amount, reason, question_id=None):
+    """Give `amount` points; returns the new balance."""
+    balance = db.session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(points=func.coalesce(User.points, 0) + amount)
+        .returning(User.points)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    _record(user_id, amount, balance, reason, question_id)
+    return balance
+
+def rebuild_balances():
+    """Recompute every users.points from the ledger."""
+    totals = db.session.query(
+        func.coalesce(func.sum(PointsTransaction.amount), 0)
+    ).filter(PointsTransaction.user_id == User.id).scalar_subquery()
+    updated = User.query.update({'points': totals}, synchronize_session=False)
+    db.session.commit()
+    identity_cache.clear()
+    rank_index.reset()
+    return updated
+
+@event.listens_for(User, 'after_insert')
+def _open_account(mapper, connection, target):
+    # New users start with their default balance; record it so the ledger sums to users.points
+    if target.points:
+        connection.execute(insert(PointsTransaction).values(
+            user_id=target.id,
+            amount=target.points,
+            balance_after=target.points,
+            reason='opening_balance',
+            created_at=target.created_at
+        ))
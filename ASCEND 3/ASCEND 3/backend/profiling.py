@@ -0,0 +1,234 @@
+import cProfile
+import importlib.util
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from collections import Counter, deque
+from logging.handlers import RotatingFileHandler
+from flask import Blueprint, g, has_app_context, jsonify, request
+from flask_login import current_user, login_required
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# ==========================================
+# Request profiling
+# ==========================================
+# Opt-in (PROFILING_ENABLED). Every request counts its SQL statements and
+# their total time through engine events, and the response carries a
+# Server-Timing header (db, app and total time). The same statement text
+# run PROFILING_REPEAT_THRESHOLD or more times in one request is reported as
+# a likely N+1. Requests slower than PROFILING_SLOW_MS are written as JSON lines to a rotating log, with the top of a cProfile or
+# pyinstrument capture when PROFILING_CAPTURE is set. Per-endpoint aggregates
+# are kept in memory, per process, and served at /admin/perf.
+#
+# Streamed bodies run after the headers are sent, so their SQL is missing
+# from Server-Timing; the aggregates and the slow log are recorded when the
+# response closes and do include it.
+
+SAMPLES_PER_ENDPOINT = 500 # Latest durations kept per endpoint for percentiles
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.statements = Counter()
+        self.profiler = None
+
+    def repeated(self, threshold):
+        return {sql: n for sql, n in self.statements.items() if n >= threshold}
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.repeated = 0 # Requests with a likely N+1
+        self.samples = deque(maxlen=SAMPLES_PER_ENDPOINT)
+
+    def add(self, duration_ms, stats, repeated):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.sql_count += stats.sql_count
+        self.sql_ms += stats.sql_seconds * 1000
+        self.repeated += bool(repeated)
+        self.samples.append(duration_ms)
+
+    def row(self, endpoint):
+        samples = sorted(self.samples)
+        def percentile(p):
+            return round(samples[min(len(samples) - 1, int(p / 100 * len(samples)))], 2)
+        return {
+            'endpoint': endpoint,
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 2),
+            'p50_ms': percentile(50),
+            'p95_ms': percentile(95),
+            'max_ms': round(self.max_ms, 2),
+            'total_ms': round(self.total_ms, 2),
+            'avg_sql': round(self.sql_count / self.count, 2),
+            'avg_sql_ms': round(self.sql_ms / self.count, 2),
+            'n_plus_one_requests': self.repeated,
+        }
+
+class Profiler:
+    def __init__(self):
+        self.slow_ms = 500
+        self.repeat_threshold = 5
+        self.capture = ''
+        self.log = logging.getLogger('ascend.perf')
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, duration_ms, stats):
+        repeated = stats.repeated(self.repeat_threshold)
+        with self._lock:
+            self._endpoints.setdefault(endpoint, EndpointStats()).add(duration_ms, stats, repeated)
+        if duration_ms >= self.slow_ms:
+            self.log.info(json.dumps({
+                'at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'endpoint': endpoint,
+                'duration_ms': round(duration_ms, 2),
+                'sql_count': stats.sql_count,
+                'sql_ms': round(stats.sql_seconds * 1000, 2),
+                'repeated': repeated,
+                'profile': self._profile_text(stats.profiler)
+            }))
+
+    def table(self, sort='total_ms'):
+        with self._lock:
+            rows = [s.row(endpoint) for endpoint, s in self._endpoints.items()]
+        return sorted(rows, key=lambda r: r.get(sort, 0), reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def start_capture(self):
+        if self.capture == 'pyinstrument':
+            from pyinstrument import Profiler as Instrument
+            profiler = Instrument()
+        elif self.capture == 'cprofile':
+            profiler = cProfile.Profile()
+        else:
+            return None
+        try:
+            profiler.enable() if isinstance(profiler, cProfile.Profile) else profiler.start()
+        except (RuntimeError, ValueError):
+            return None # Another capture is already running on this thread
+        return profiler
+
+    @staticmethod
+    def stop_capture(profiler):
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+        elif profiler is not None:
+            profiler.stop()
+
+    @staticmethod
+    def _profile_text(profiler):
+        if profiler is None:
+            return None
+        if isinstance(profiler, cProfile.Profile):
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(25)
+            return out.getvalue()
+        return profiler.output_text(unicode=True, color=False)
+
+profiler = Profiler()
+
+# SQL accounting
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['perf_started'] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = g.get('perf') if has_app_context() else None
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_seconds += time.perf_counter() - conn.info.get('perf_started', time.perf_counter())
+        stats.statements[statement] += 1
+
+# Request hooks
+
+def _start_request():
+    g.perf = RequestStats()
+    g.perf.profiler = profiler.start_capture()
+
+def _finish_request(response):
+    stats = g.get('perf')
+    if stats is None:
+        return response
+    elapsed = time.perf_counter() - stats.started
+    db_ms = stats.sql_seconds * 1000
+    response.headers.add('Server-Timing', f'db;dur={db_ms:.2f};desc="{stats.sql_count} queries"')
+    response.headers.add('Server-Timing', f'app;dur={elapsed * 1000 - db_ms:.2f}')
+    response.headers.add('Server-Timing', f'total;dur={elapsed * 1000:.2f}')
+    repeated = stats.repeated(profiler.repeat_threshold)
+    if repeated:
+        response.headers['X-Repeated-Queries'] = str(sum(repeated.values()))
+    endpoint = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+
+    def close():
+        profiler.stop_capture(stats.profiler)
+        profiler.record(endpoint, (time.perf_counter() - stats.started) * 1000, stats)
+    response.call_on_close(close)
+    return response
+
+# Aggregates
+
+perf = Blueprint('perf', __name__, url_prefix='/admin')
+
+@perf.route('/perf', methods=['GET', 'DELETE'])
+@login_required
+def get_perf():
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    if request.method == 'DELETE':
+        profiler.reset()
+        return jsonify({'message': 'Profiling aggregates reset'})
+    return jsonify({
+        'slow_ms': profiler.slow_ms,
+        'repeat_threshold': profiler.repeat_threshold,
+        'endpoints': profiler.table(request.args.get('sort', 'total_ms'))
+    })
+
+def init_app(app):
+    app.config.setdefault('PROFILING_ENABLED', False)
+    app.config.setdefault('PROFILING_SLOW_MS', 500)
+    app.config.setdefault('PROFILING_REPEAT_THRESHOLD', 5)
+    app.config.setdefault('PROFILING_CAPTURE', '')
+    app.config.setdefault('PROFILING_LOG', os.path.join(app.instance_path, 'perf.log'))
+    app.config.setdefault('PROFILING_LOG_BYTES', 10 * 1024 * 1024)
+    app.config.setdefault('PROFILING_LOG_BACKUPS', 5)
+    if not app.config['PROFILING_ENABLED']:
+        return
+
+    profiler.slow_ms = app.config['PROFILING_SLOW_MS']
+    profiler.repeat_threshold = app.config['PROFILING_REPEAT_THRESHOLD']
+    profiler.capture = app.config['PROFILING_CAPTURE']
+    if profiler.capture == 'pyinstrument' and importlib.util.find_spec('pyinstrument') is None:
+        app.logger.warning('pyinstrument is not installed; profiling with cProfile instead')
+        profiler.capture = 'cprofile'
+    if not profiler.log.handlers:
+        os.makedirs(os.path.dirname(app.config['PROFILING_LOG']) or '.', exist_ok=True)
+        handler = RotatingFileHandler(app.config['PROFILING_LOG'], maxBytes=app.config['PROFILING_LOG_BYTES'],
+                                      backupCount=app.config['PROFILING_LOG_BACKUPS'])
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        profiler.log.addHandler(handler)
+        profiler.log.setLevel(logging.INFO)
+        profiler.log.propagate = False
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.register_blueprint(perf)
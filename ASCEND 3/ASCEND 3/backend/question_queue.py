@@ -0,0 +1,136 @@
+import time
+from bisect import bisect_left, insort
+from sqlalchemy import func
+from commit_queue import CommitQueue, RebuiltIndex
+from db_routing import primary
+from models import db, User, ProfileInfo, Question
+
+# ==========================================
+# Unanswered question queues
+# ==========================================
+# The mentor dashboard shows the newest general questions and the urgent
+# questions with the biggest bounties, plus how many are still unanswered.
+# Instead of querying for those on every load, unanswered questions are kept
+# in memory in two sorted arrays: general keyed by age and urgent keyed by
+# (bounty, age). create_question and reply_question queue their changes with
+# record_question()/record_answered(), which are applied after commit; ORM
+# deletes of Question are picked up by the flush hook. The queues are loaded
+# on first use and again every QUESTION_QUEUE_REBUILD_INTERVAL seconds (see
+# commit_queue.py). Every unanswered question stays in memory, so cards keep
+# only the first PREVIEW_LENGTH characters of the body.
+
+PREVIEW_LENGTH = 280
+
+def _timestamp(created_at):
+    return created_at.timestamp() if created_at else 0.0
+
+def _preview(content):
+    content = content or ""
+    return content if len(content) <= PREVIEW_LENGTH else content[:PREVIEW_LENGTH].rstrip() + "\u2026"
+
+def _card(question_id, title, content, is_urgent, bounty, created_at, author):
+    return {
+        'id': question_id,
+        'title': title,
+        'content': _preview(content),
+        'is_urgent': bool(is_urgent),
+        'bounty': bounty or 0,
+        'created_at': created_at,
+        'author': author
+    }
+
+class QuestionQueue(RebuiltIndex):
+    def __init__(self, rebuild_interval=300):
+        super().__init__(rebuild_interval)
+        self._cards = {} # question_id -> card
+        self._general = [] # sorted [(-created, -id)], newest first
+        self._urgent = [] # sorted [(-bounty, -created, -id)], biggest bounty first
+
+    @staticmethod
+    def _key(card):
+        created = _timestamp(card['created_at'])
+        if card['is_urgent']:
+            return (-card['bounty'], -created, -card['id'])
+        return (-created, -card['id'])
+
+    def _ensure_built(self):
+        if not self._expired():
+            return
+        # One character past the preview, so _preview can tell it was cut
+        rows = db.session.query(
+            Question.id, Question.title, func.substr(Question.content, 1, PREVIEW_LENGTH + 1), Question.is_urgent, Question.bounty,
+            Question.created_at, User.username, ProfileInfo.full_name
+        ).outerjoin(User, Question.user_id == User.id).outerjoin(
+            ProfileInfo, ProfileInfo.user_id == User.id
+        ).filter(Question.is_answered == False)
+        with primary():
+            rows = rows.all()
+        cards, general, urgent = {}, [], []
+        for question_id, title, content, is_urgent, bounty, created_at, username, full_name in rows:
+            card = _card(question_id, title, content, is_urgent, bounty, created_at, full_name or username)
+            cards[question_id] = card
+            (urgent if card['is_urgent'] else general).append(self._key(card))
+        general.sort()
+        urgent.sort()
+        self._cards, self._general, self._urgent, self._built_at = cards, general, urgent, time.time()
+
+    def _remove(self, question_id):
+        card = self._cards.pop(question_id, None)
+        if card is None:
+            return
+        queue = self._urgent if card['is_urgent'] else self._general
+        key = self._key(card)
+        i = bisect_left(queue, key)
+        if i < len(queue) and queue[i] == key:
+            del queue[i]
+
+    def apply(self, added, removed):
+        """Apply committed changes: {id: card} to enqueue, {ids} to drop."""
+        with self._lock:
+            if self._built_at is None:
+                return # Not built yet; the first read loads everything
+            for question_id, card in added.items():
+                self._remove(question_id)
+                self._cards[question_id] = card
+                insort(self._urgent if card['is_urgent'] else self._general, self._key(card))
+            for question_id in removed:
+                self._remove(question_id)
+
+    def general(self, limit):
+        """Newest unanswered non-urgent question cards."""
+        with self._lock:
+            self._ensure_built()
+            return [self._cards[-key[1]] for key in self._general[:limit]]
+
+    def urgent(self, limit):
+        """Unanswered urgent question cards, biggest bounty first."""
+        with self._lock:
+            self._ensure_built()
+            return [self._cards[-key[2]] for key in self._urgent[:limit]]
+
+    def count(self):
+        with self._lock:
+            self._ensure_built()
+            return len(self._cards)
+
+question_queue = QuestionQueue()
+changes = CommitQueue('question_queue', question_queue.apply, added=dict, removed=set)
+
+def record_question(question, author, session=None):
+    """Queue a newly flushed question; it becomes visible after commit."""
+    changes.pending(session)['added'][question.id] = _card(
+        question.id, question.title, question.content, question.is_urgent,
+        question.bounty, question.created_at, author)
+
+def record_answered(question_id, session=None):
+    """Queue the removal of a question that just got its first reply."""
+    changes.pending(session)['removed'].add(question_id)
+
+def _collect_deletes(session, queued):
+    for obj in session.deleted:
+        if isinstance(obj, Question):
+            queued['removed'].add(obj.id)
+
+def init_app(app):
+    question_queue.configure(app, 'QUESTION_QUEUE_REBUILD_INTERVAL')
+    changes.listen(_collect_deletes)
@@ -0,0 +1,245 @@
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func
+from commit_queue import CommitQueue, RebuiltIndex
+from db_routing import primary
+from models import db, User, Skill, ProfileInfo, Experience, Company, Reply
+
+# ==========================================
+# Mentor recommendations
+# ==========================================
+# Every mentor is a sparse term vector built from their skills, current goal,
+# company / job title and experience history. A student is turned into a vector
+# the same way and all mentors are scored at once: cosine over TF-IDF is a
+# single sparse matrix-vector product, blended with a reply-history trust
+# signal. The matrix is rebuilt row by row: commits that touch a user, skill,
+# profile or experience mark that user dirty and only dirty rows are re-read
+# on the next query, with a full rebuild every RECOMMENDER_REBUILD_INTERVAL
+# seconds (see commit_queue.py).
+
+MENTOR_ROLES = ('alumni', 'mentor')
+TRUST_WEIGHT = 0.2 # Share of the final score that comes from reply history
+SKILL_WEIGHT = 2.0 # Skills are the most specific signal we have
+QUERY_CACHE_SIZE = 4096
+TOKEN = re.compile(r"[a-z0-9+#]+")
+STOPWORDS = {'a', 'an', 'and', 'as', 'at', 'be', 'become', 'for', 'in', 'into', 'of', 'on', 'the', 'to', 'with'}
+
+def _terms(value):
+    return [t for t in TOKEN.findall((value or '').lower()) if t not in STOPWORDS]
+
+def _features(user_ids):
+    """{user_id: Counter(term -> weight)} for the given users, in four queries."""
+    features = defaultdict(Counter)
+    if not user_ids:
+        return features
+    for user_id, name in db.session.query(Skill.user_id, Skill.name).filter(Skill.user_id.in_(user_ids)):
+        for term in _terms(name):
+            features[user_id][term] += SKILL_WEIGHT
+    for user_id, goal, company, job_title in db.session.query(
+        ProfileInfo.user_id, ProfileInfo.current_goal, ProfileInfo.company, ProfileInfo.job_title
+    ).filter(ProfileInfo.user_id.in_(user_ids)):
+        for term in _terms(goal) + _terms(company) + _terms(job_title):
+            features[user_id][term] += 1
+    for user_id, role, company in db.session.query(
+        Experience.user_id, Experience.role, Company.name
+    ).outerjoin(Company, Experience.company_id == Company.id).filter(Experience.user_id.in_(user_ids)):
+        for term in _terms(role) + _terms(company):
+            features[user_id][term] += 1
+    return features
+
+def _row(vocabulary, counter):
+    columns = np.fromiter(
+        (vocabulary.setdefault(t, len(vocabulary)) for t in counter),
+        dtype=np.int32, count=len(counter)
+    )
+    return columns, np.fromiter(counter.values(), dtype=np.float64, count=len(counter))
+
+def _assemble(vocabulary, rows):
+    """(ids, matrix, idf2, norms) for a {mentor id: row} mapping."""
+    ids = sorted(rows)
+    ordered = [rows[i] for i in ids]
+    lengths = np.fromiter((len(c) for c, _ in ordered), dtype=np.int64, count=len(ordered))
+    indptr = np.concatenate(([0], np.cumsum(lengths)))
+    indices = np.concatenate([c for c, _ in ordered]) if ordered else np.empty(0, dtype=np.int32)
+    data = np.concatenate([w for _, w in ordered]) if ordered else np.empty(0)
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(ids), len(vocabulary)))
+    # Smoothed IDF; squared because it weights both the mentor and the student side
+    df = np.bincount(indices, minlength=len(vocabulary))
+    idf = np.log((1 + len(ids)) / (1 + df)) + 1
+    idf2 = idf ** 2
+    norms = np.sqrt(matrix.multiply(matrix) @ idf2)
+    return np.asarray(ids, dtype=np.int64), matrix, idf2, norms
+
+class MentorIndex(RebuiltIndex):
+    """Rows and matrices are rebuilt on copies, outside the lock, by one thread
+    at a time, then swapped in; queries meanwhile keep using the previous ones.
+    """
+
+    def __init__(self, rebuild_interval=300):
+        super().__init__(rebuild_interval)
+        self._build_lock = threading.Lock()
+        self._vocabulary = {} # term -> column
+        self._rows = {} # mentor id -> (columns, weights)
+        self._replies = {} # mentor id -> replies given
+        self._queries = {} # student id -> features, dropped with the same dirty marks
+        self._dirty = set()
+        self._trust_stale = False
+        # Derived state, swapped in whenever rows change
+        self._ids = np.empty(0, dtype=np.int64)
+        self._matrix = None
+        self._idf2 = None
+        self._norms = None
+        self._trust = None
+
+    def mark_dirty(self, user_ids):
+        with self._lock:
+            self._dirty.update(user_ids)
+            for user_id in user_ids:
+                self._queries.pop(user_id, None)
+
+    def add_replies(self, counts):
+        with self._lock:
+            for user_id, delta in counts.items():
+                self._replies[user_id] = max(0, self._replies.get(user_id, 0) + delta)
+            self._trust_stale = True
+
+    def _load_all(self, vocabulary, rows):
+        """Read every mentor row; returns the reply counts."""
+        mentor_ids = [i for (i,) in db.session.query(User.id).filter(User.role.in_(MENTOR_ROLES))]
+        features = _features(mentor_ids)
+        rows.update((i, _row(vocabulary, features.get(i, {}))) for i in mentor_ids)
+        # One aggregate pass over replies; later replies arrive through add_replies
+        return {user_id: count for user_id, count in db.session.query(
+            Reply.user_id, func.count(Reply.id)
+        ).group_by(Reply.user_id) if user_id in rows}
+
+    def _load_dirty(self, vocabulary, rows, user_ids):
+        mentor_ids = {i for (i,) in db.session.query(User.id).filter(
+            User.id.in_(user_ids), User.role.in_(MENTOR_ROLES)
+        )}
+        features = _features(list(mentor_ids))
+        for user_id in user_ids:
+            if user_id in mentor_ids:
+                rows[user_id] = _row(vocabulary, features.get(user_id, {}))
+            else:
+                rows.pop(user_id, None)
+
+    def _refresh(self):
+        with self._lock:
+            if not self._expired() and not self._dirty:
+                return
+            # Only the very first build makes callers wait
+            wait = self._matrix is None
+        if not self._build_lock.acquire(blocking=wait):
+            return
+        try:
+            with self._lock:
+                full = self._expired()
+                if not full and not self._dirty:
+                    return
+                # Marks arriving from here on are applied by the next refresh
+                dirty, self._dirty = self._dirty, set()
+                vocabulary = {} if full else dict(self._vocabulary)
+                rows = {} if full else dict(self._rows)
+                started = time.time()
+            with primary():
+                if full:
+                    replies = self._load_all(vocabulary, rows)
+                else:
+                    self._load_dirty(vocabulary, rows, dirty)
+            state = _assemble(vocabulary, rows)
+            with self._lock:
+                self._vocabulary, self._rows = vocabulary, rows
+                self._ids, self._matrix, self._idf2, self._norms = state
+                if full:
+                    self._replies = replies
+                    self._queries.clear()
+                    self._built_at = started
+                self._trust_stale = True
+        finally:
+            self._build_lock.release()
+
+    def _refresh_trust(self):
+        replies = np.fromiter((self._replies.get(int(i), 0) for i in self._ids), dtype=np.float64, count=len(self._ids))
+        signal = np.log1p(replies)
+        peak = signal.max() if len(signal) else 0
+        self._trust = signal / peak if peak else signal
+        self._trust_stale = False
+
+    def recommend(self, user_id, limit=3, exclude=()):
+        """[(mentor_id, score)] best first; score is in [0, 1]."""
+        self._refresh()
+        with self._lock:
+            student = self._queries.get(user_id)
+        if student is None:
+            # Cached until the student's next change, so not from a lagging replica
+            with primary():
+                student = _features([user_id]).get(user_id, Counter())
+        with self._lock:
+            if len(self._queries) >= QUERY_CACHE_SIZE:
+                self._queries.clear()
+            self._queries[user_id] = student
+            if self._trust_stale:
+                self._refresh_trust()
+            vocabulary, ids, matrix, idf2, norms, trust = (
+                self._vocabulary, self._ids, self._matrix, self._idf2, self._norms, self._trust)
+        if not len(ids):
+            return []
+
+        query = np.zeros(len(vocabulary))
+        for term, weight in student.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                query[column] = weight
+        weighted = query * idf2
+        query_norm = math.sqrt(float(query @ weighted))
+        similarity = np.zeros(len(ids))
+        if query_norm:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                similarity = np.nan_to_num(matrix @ weighted / (norms * query_norm))
+        scores = (1 - TRUST_WEIGHT) * similarity + TRUST_WEIGHT * trust
+
+        excluded = set(exclude) | {user_id}
+        if excluded:
+            keep = ~np.isin(ids, list(excluded))
+            ids, scores = ids[keep], scores[keep]
+        if len(ids) > limit:
+            top = np.argpartition(-scores, limit)[:limit]
+        else:
+            top = np.arange(len(ids))
+        # Ties (e.g. a student with no profile yet) fall back to the oldest account
+        top = sorted(top, key=lambda k: (-scores[k], ids[k]))
+        return [(int(ids[k]), float(scores[k])) for k in top]
+
+mentor_index = MentorIndex()
+
+def recommend_mentors(user_id, limit=3, exclude=()):
+    return mentor_index.recommend(user_id, limit, exclude)
+
+def _collect_changes(session, queued):
+    # after_flush so that new rows already have their ids
+    for objects, delta in ((session.new, 1), (session.dirty, 0), (session.deleted, -1)):
+        for obj in objects:
+            if isinstance(obj, User):
+                queued['changed'].add(obj.id)
+            elif isinstance(obj, (Skill, ProfileInfo, Experience)) and obj.user_id is not None:
+                queued['changed'].add(obj.user_id)
+            elif isinstance(obj, Reply) and delta and obj.user_id is not None:
+                queued['replies'][obj.user_id] += delta
+
+def _apply_committed(changed, replies):
+    if changed:
+        mentor_index.mark_dirty(changed)
+    if replies:
+        mentor_index.add_replies(replies)
+
+changes = CommitQueue('mentor_index', _apply_committed, changed=set, replies=Counter)
+
+def init_app(app):
+    mentor_index.configure(app, 'RECOMMENDER_REBUILD_INTERVAL')
+    changes.listen(_collect_changes)
@@ -0,0 +1,99 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request, make_response
+from metrics import cache_lookup
+
+# ==========================================
+# Response cache for near-static endpoints
+# ==========================================
+# Caches the serialized body of successful GET responses per group, keyed by
+# endpoint, view args and the query parameters the view declares (any other
+# query string is ignored, so it cannot mint new entries). Each group is an
+# LRU of at most RESPONSE_CACHE_SIZE entries. Every response carries a strong ETag,
+# so a revalidating browser gets a 304 without the view, the database or the
+# JSON encoder running. Write paths call invalidate(group); entries also
+# expire after RESPONSE_CACHE_TTL seconds, which bounds staleness in other
+# worker processes.
+
+class ResponseCache:
+    def __init__(self):
+        self._entries = {} # group -> OrderedDict {key: (expires_at, body, mimetype, etag)}, oldest first
+        self._generations = {} # group -> bumped on every invalidation
+        self._lock = threading.Lock()
+
+    def generation(self, group):
+        with self._lock:
+            return self._generations.get(group, 0)
+
+    def get(self, group, key):
+        with self._lock:
+            entries = self._entries.get(group)
+            entry = entries.get(key) if entries else None
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return entry
+
+    def put(self, group, key, ttl, max_size, body, mimetype, etag, generation):
+        with self._lock:
+            # Drop bodies computed before an invalidation that raced with them
+            if self._generations.get(group, 0) != generation:
+                return
+            entries = self._entries.setdefault(group, OrderedDict())
+            entries[key] = (time.time() + ttl, body, mimetype, etag)
+            entries.move_to_end(key)
+            while len(entries) > max_size:
+                entries.popitem(last=False)
+
+    def invalidate(self, group):
+        with self._lock:
+            self._entries.pop(group, None)
+            self._generations[group] = self._generations.get(group, 0) + 1
+
+cache = ResponseCache()
+
+def invalidate(group):
+    cache.invalidate(group)
+
+def _finish(body, mimetype, etag):
+    response = make_response(body)
+    response.mimetype = mimetype
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=%d' % current_app.config.get('RESPONSE_CACHE_MAX_AGE', 0)
+    # Turns the response into a bodyless 304 when If-None-Match matches
+    return response.make_conditional(request)
+
+def cached_response(group, params=()):
+    """Cache a GET view's 200 responses under `group` with ETag/304 handling.
+
+    `params` lists the query parameters the view reads; they are part of the
+    cache key, every other parameter is ignored.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            query = tuple((name, tuple(request.args.getlist(name))) for name in params)
+            key = (request.endpoint, tuple(sorted(kwargs.items())), query)
+            entry = cache.get(group, key)
+            cache_lookup('response:' + group, entry is not None)
+            if entry is not None:
+                _, body, mimetype, etag = entry
+                return _finish(body, mimetype, etag)
+
+            generation = cache.generation(group)
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            body = response.get_data()
+            etag = hashlib.sha256(body).hexdigest()
+            cache.put(group, key, current_app.config.get('RESPONSE_CACHE_TTL', 300),
+                      current_app.config.get('RESPONSE_CACHE_SIZE', 256), body, response.mimetype, etag, generation)
+            return _finish(body, response.mimetype, etag)
+        return wrapper
+    return decorator
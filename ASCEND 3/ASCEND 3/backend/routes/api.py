@@ -1,10 +1,32 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, make_response, request
 from flask_login import login_required, current_user
-from models import User, Company, CareerPath, ProfileInfo, Experience, Roadmap, DiscussionThread, Question, Reply, MentorshipRequest, Message, db
+from models import User, Company, CareerPath, ProfileInfo, Roadmap, RoadmapSave, DiscussionThread, ThreadLike, Question, Reply, MentorshipRequest, MentorStats, PointsTransaction, Message, Conversation, db
 from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from loaders import with_profile, replies_by_question, latest_experiences
+from pagination import paginate, offset_args, encode_cursor
+from events import broker, publish, StreamLimitReached
+from db_routing import reads_primary
+from response_cache import cached_response, invalidate
+from search import search, KINDS as SEARCH_KINDS
+from recommendations import recommend_mentors
+import points
+from leaderboard import rank_index
+from question_queue import question_queue, record_question, record_answered
+from serializers import QUESTION_LIST, MENTOR_LIST, CONNECTED_MENTORS, RECOMMENDED_MENTOR
 
 api = Blueprint('api', __name__, url_prefix='/api')
 
+# Sort orders for cursor-paginated lists; each ends in the primary key as tie-breaker
+QUESTION_ORDER = [(Question.is_urgent, 'desc'), (Question.bounty, 'desc'), (Question.created_at, 'desc'), (Question.id, 'desc')]
+RECENT_QUESTION_ORDER = [(Question.created_at, 'desc'), (Question.id, 'desc')]
+THREAD_ORDER = [(DiscussionThread.created_at, 'desc'), (DiscussionThread.id, 'desc')]
+MESSAGE_ORDER = [(Message.created_at, 'asc'), (Message.id, 'asc')]
+CONVERSATION_ORDER = [(Conversation.last_message_at, 'desc'), (Conversation.id, 'desc')]
+USER_ORDER = [(User.id, 'desc')]
+POINTS_ORDER = [(PointsTransaction.id, 'desc')]
+LEADERBOARD_ROLES = ('student', 'mentor', 'alumni')
+
 @api.route('/user/profile', methods=['GET'])
 @login_required
 def get_profile():
@@ -61,6 +83,8 @@ def update_profile():
     profile.current_goal = data.get('current_goal', profile.current_goal)
     
     db.session.commit()
+    # Roadmap listings show the creator's display name
+    invalidate('catalogue')
     
     # Handle Skills (simple replace)
     if 'skills' in data:
@@ -83,7 +107,7 @@ def update_profile():
 @login_required
 def get_dashboard():
     # User Info
-    user_name = current_user.profile_info.full_name if current_user.profile_info and current_user.profile_info.full_name else current_user.username
+    user_name = current_user.display_name
     
     # Stats
     question_count = current_user.questions.count()
@@ -96,30 +120,18 @@ def get_dashboard():
     # Connections: Accepted mentorship requests
     connections = MentorshipRequest.query.filter_by(student_id=current_user.id, status='accepted').count()
     
-    # Recommended Mentors (Logic: Users with role 'alumni' or 'mentor')
-    # In a real app, this would use matching algorithms based on skills/goals
-    mentors = User.query.filter(User.role.in_(['alumni', 'mentor'])).limit(3).all()
-    mentors_data = []
-    for m in mentors:
-        company_name = "Unknown"
-        job_role = "Mentor"
-        # Try to find current experience
-        latest_exp = m.experiences.order_by(Experience.id.desc()).first()
-        if latest_exp:
-            company_name = latest_exp.company.name if latest_exp.company else "Unknown"
-            job_role = latest_exp.role
-            
-        mentors_data.append({
-            'id': m.id,
-            'name': m.profile_info.full_name if m.profile_info and m.profile_info.full_name else m.username,
-            'role': job_role,
-            'company': company_name,
-            'trust_score': 95 # Mock score
-        })
+    # Recommended Mentors: skills/goal/company match blended with reply history
+    ranked = recommend_mentors(current_user.id, limit=3)
+    mentor_rows = {m.id: m for m in with_profile(User.query, 'mentor_card').filter(User.id.in_([i for i, _ in ranked])).all()}
+    mentors = [mentor_rows[i] for i, _ in ranked if i in mentor_rows]
+    mentors_data = RECOMMENDED_MENTOR.dump_all(mentors, {
+        'experience': latest_experiences([m.id for m in mentors]),
+        'match': dict(ranked)
+    })
         
     # Recent Activity (Mocking global activity for now)
     # Fetch lates questions from other users
-    latest_questions = Question.query.order_by(Question.created_at.desc()).limit(3).all()
+    latest_questions = with_profile(Question.query, 'question_author').order_by(Question.created_at.desc()).limit(3).all()
     activity_feed = []
     for q in latest_questions:
         author_name = q.author.profile_info.full_name if q.author.profile_info and q.author.profile_info.full_name else q.author.username
@@ -154,7 +166,7 @@ def get_student_questions():
             'is_urgent': q.is_urgent,
             'bounty': q.bounty,
             'created_at': q.created_at.strftime("%Y-%m-%d"),
-            'reply_count': q.replies.count()
+            'reply_count': q.reply_count or 0
         })
     return jsonify(output)
 
@@ -162,7 +174,7 @@ def get_student_questions():
 @login_required
 def get_student_responses():
     # Fetch replies to questions authored by current_user
-    responses = Reply.query.join(Question).filter(Question.user_id == current_user.id).order_by(Reply.created_at.desc()).all()
+    responses = with_profile(Reply.query, 'reply_author_question').join(Question).filter(Question.user_id == current_user.id).order_by(Reply.created_at.desc()).all()
     output = []
     for r in responses:
         author_name = r.author.profile_info.full_name if r.author.profile_info and r.author.profile_info.full_name else r.author.username
@@ -179,63 +191,60 @@ def get_student_responses():
 @api.route('/mentors', methods=['GET'])
 @login_required
 def get_all_mentors():
-    mentors = User.query.filter(User.role.in_(['alumni', 'mentor'])).all()
-    
-    # Get connection statuses for current user
-    my_requests = MentorshipRequest.query.filter_by(student_id=current_user.id).all()
-    status_map = {r.mentor_id: r.status for r in my_requests}
-
-    mentors_data = []
-    for m in mentors:
-        company_name = "Unknown"
-        job_role = "Mentor"
-        # Try to find current experience
-        latest_exp = m.experiences.order_by(Experience.id.desc()).first()
-        if latest_exp:
-            company_name = latest_exp.company.name if latest_exp.company else "Unknown"
-            job_role = latest_exp.role
-            
-        mentors_data.append({
-            'id': m.id,
-            'name': m.profile_info.full_name if m.profile_info and m.profile_info.full_name else m.username,
-            'role': job_role,
-            'company': company_name,
-            'bio': m.profile_info.bio if m.profile_info else "No bio available.",
-            'initials': (m.profile_info.full_name if m.profile_info and m.profile_info.full_name else m.username)[:2].upper(),
-            'connection_status': status_map.get(m.id, 'none')
-        })
-    return jsonify(mentors_data)
+    try:
+        selection = MENTOR_LIST.select()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    mentors = with_profile(User.query, 'mentor_card').options(selection.load_only(User.role)).filter(User.role.in_(['alumni', 'mentor'])).all()
+    ctx = {}
+    if selection.needs('experience'):
+        ctx['experience'] = latest_experiences([m.id for m in mentors])
+    if selection.needs('status'):
+        # Get connection statuses for current user
+        my_requests = MentorshipRequest.query.filter_by(student_id=current_user.id).all()
+        ctx['status'] = {r.mentor_id: r.status for r in my_requests}
+    return jsonify(selection.dump_all(mentors, ctx))
 
 @api.route('/student/mentors', methods=['GET'])
 @login_required
 def get_connected_mentors():
     # Fetch mentors with accepted mentorship requests
-    accepted_requests = MentorshipRequest.query.filter_by(student_id=current_user.id, status='accepted').all()
-    
-    mentors_data = []
-    for req in accepted_requests:
-        m = req.mentor
-        company_name = "Unknown"
-        job_role = "Mentor"
-        # Try to find current experience
-        latest_exp = m.experiences.order_by(Experience.id.desc()).first()
-        if latest_exp:
-            company_name = latest_exp.company.name if latest_exp.company else "Unknown"
-            job_role = latest_exp.role
-            
-        mentors_data.append({
-            'id': m.id,
-            'name': m.profile_info.full_name if m.profile_info and m.profile_info.full_name else m.username,
-            'role': job_role,
-            'company': company_name,
-            'bio': m.profile_info.bio if m.profile_info else "No bio available.",
-            'initials': (m.profile_info.full_name if m.profile_info and m.profile_info.full_name else m.username)[:2].upper()
-        })
-    return jsonify(mentors_data)
+    try:
+        selection = CONNECTED_MENTORS.select()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    query = with_profile(MentorshipRequest.query, 'request_mentor')
+    if selection.needs('stats'):
+        query = with_profile(query, 'request_mentor_stats')
+    accepted_requests = query.filter_by(student_id=current_user.id, status='accepted').all()
+    ctx = {}
+    if selection.needs('experience'):
+        ctx['experience'] = latest_experiences([req.mentor_id for req in accepted_requests])
+    return jsonify(selection.dump_all([req.mentor for req in accepted_requests], ctx))
 
 
 
+@api.route('/search', methods=['GET'])
+@login_required
+def search_content():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Search query is required'}), 400
+    kinds = [k for k in request.args.get('type', ','.join(SEARCH_KINDS)).split(',') if k in SEARCH_KINDS]
+    if not kinds:
+        return jsonify({'error': 'Invalid type'}), 400
+    try:
+        limit, offset = offset_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Fetch one extra hit to know whether there is a next page
+    hits = search(query, kinds, limit + 1, offset)
+    next_cursor = encode_cursor([offset + limit]) if len(hits) > limit else None
+    return jsonify({'items': hits[:limit], 'next_cursor': next_cursor})
+
 @api.route('/companies', methods=['GET'])
+@cached_response('catalogue')
 def get_companies():
     companies = Company.query.all()
     companies_data = []
@@ -248,6 +257,7 @@ def get_companies():
     return jsonify(companies_data)
 
 @api.route('/career/paths', methods=['GET'])
+@cached_response('catalogue')
 def get_career_paths():
     paths = CareerPath.query.all()
     return jsonify([{
@@ -256,8 +266,9 @@ def get_career_paths():
     } for p in paths])
 
 @api.route('/career/roadmaps', methods=['GET'])
+@cached_response('catalogue')
 def get_roadmaps():
-    roadmaps = Roadmap.query.all()
+    roadmaps = with_profile(Roadmap.query, 'roadmap_creator').all()
     result = []
     for r in roadmaps:
         creator_name = r.creator.profile_info.full_name if r.creator.profile_info and r.creator.profile_info.full_name else r.creator.username
@@ -266,11 +277,12 @@ def get_roadmaps():
             'title': r.title,
             'description': r.description,
             'creator': creator_name,
-            'saves': 120 # Mock
+            'saves': r.save_count or 0
         })
     return jsonify(result)
 
 @api.route('/career/roadmaps/<int:roadmap_id>', methods=['GET'])
+@cached_response('catalogue')
 def get_roadmap_detail(roadmap_id):
     r = Roadmap.query.get_or_404(roadmap_id)
     creator_name = r.creator.profile_info.full_name if r.creator.profile_info and r.creator.profile_info.full_name else r.creator.username
@@ -282,14 +294,39 @@ def get_roadmap_detail(roadmap_id):
         'steps': r.steps, 
         'creator': creator_name,
         'creator_role': r.creator.role,
-        'saves': 120 # Mock
+        'saves': r.save_count or 0
     })
 
+@api.route('/career/roadmaps/<int:roadmap_id>/save', methods=['POST', 'DELETE'])
+@login_required
+def save_roadmap(roadmap_id):
+    roadmap = Roadmap.query.get_or_404(roadmap_id)
+    if request.method == 'POST':
+        exists = RoadmapSave.query.filter_by(roadmap_id=roadmap.id, user_id=current_user.id).first() is not None
+        if not exists:
+            db.session.add(RoadmapSave(roadmap_id=roadmap.id, user_id=current_user.id))
+        delta = 0 if exists else 1
+    else:
+        delta = -RoadmapSave.query.filter_by(roadmap_id=roadmap.id, user_id=current_user.id).delete(synchronize_session=False)
+    if delta:
+        try:
+            Roadmap.query.filter_by(id=roadmap.id).update(
+                {'save_count': db.func.coalesce(Roadmap.save_count, 0) + delta}, synchronize_session=False)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback() # A concurrent POST inserted it first and counted it
+        else:
+            invalidate('catalogue')
+    return jsonify({'saved': request.method == 'POST', 'saves': roadmap.save_count or 0})
+
 @api.route('/discussions', methods=['GET'])
 def get_discussions():
-    threads = DiscussionThread.query.order_by(DiscussionThread.created_at.desc()).all()
+    try:
+        page = paginate(with_profile(DiscussionThread.query, 'thread_author'), THREAD_ORDER)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     result = []
-    for t in threads:
+    for t in page.items:
         author = t.author
         author_name = author.profile_info.full_name if author.profile_info and author.profile_info.full_name else author.username
         role = author.role
@@ -300,39 +337,48 @@ def get_discussions():
             'author': author_name,
             'author_role': role,
             'created_at': t.created_at.strftime("%Y-%m-%d"),
-            'likes': 42 + t.id * 2, # Mock
-            'replies': 5 + t.id # Mock
+            'likes': t.like_count or 0,
+            'replies': 0 # Threads have no replies yet
         })
-    return jsonify(result)
+    return page.response(result)
+
+@api.route('/discussions/<int:thread_id>/like', methods=['POST', 'DELETE'])
+@login_required
+def like_discussion(thread_id):
+    thread = DiscussionThread.query.get_or_404(thread_id)
+    if request.method == 'POST':
+        exists = ThreadLike.query.filter_by(thread_id=thread.id, user_id=current_user.id).first() is not None
+        if not exists:
+            db.session.add(ThreadLike(thread_id=thread.id, user_id=current_user.id))
+        delta = 0 if exists else 1
+    else:
+        delta = -ThreadLike.query.filter_by(thread_id=thread.id, user_id=current_user.id).delete(synchronize_session=False)
+    if delta:
+        try:
+            DiscussionThread.query.filter_by(id=thread.id).update(
+                {'like_count': db.func.coalesce(DiscussionThread.like_count, 0) + delta}, synchronize_session=False)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback() # A concurrent POST inserted it first and counted it
+    return jsonify({'liked': request.method == 'POST', 'likes': thread.like_count or 0})
 @api.route('/questions', methods=['GET'])
 @login_required
 def get_questions():
-    questions = Question.query.order_by(Question.is_urgent.desc(), Question.bounty.desc(), Question.created_at.desc()).all()
-    output = []
-    for q in questions:
-        author = q.author
-        replies = []
-        for r in q.replies:
-             replies.append({
-                 'id': r.id,
-                 'content': r.content,
-                 'author_name': r.author.profile_info.full_name if r.author.profile_info and r.author.profile_info.full_name else r.author.username,
-                 'author_role': r.author.role,
-                 'created_at': r.created_at.strftime("%Y-%m-%d")
-             })
+    try:
+        selection = QUESTION_LIST.select()
+        query = Question.query.options(selection.load_only(*[column for column, _ in QUESTION_ORDER]))
+        if selection.needs('author'):
+            query = with_profile(query, 'question_author')
+        page = paginate(query, QUESTION_ORDER)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-        output.append({
-            'id': q.id,
-            'title': q.title,
-            'content': q.content,
-            'is_urgent': q.is_urgent,
-            'bounty': q.bounty,
-            'author_name': author.profile_info.full_name if author.profile_info and author.profile_info.full_name else author.username,
-            'author_initials': author.username[:2].upper(),
-            'created_at': q.created_at.strftime("%Y-%m-%d"),
-            'replies': replies
-        })
-    return jsonify(output)
+    def serialize(questions):
+        ctx = {}
+        if selection.needs('replies'):
+            ctx['replies'] = replies_by_question([q.id for q in questions])
+        return selection.dump_all(questions, ctx)
+    return page.stream(serialize)
 
 @api.route('/questions', methods=['POST'])
 @login_required
@@ -341,17 +387,15 @@ def create_question():
     title = data.get('title')
     content = data.get('content')
     is_urgent = data.get('is_urgent', False)
-    bounty = int(data.get('bounty', 0)) if is_urgent else 0
+    try:
+        bounty = int(data.get('bounty', 0)) if is_urgent else 0
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid bounty'}), 400
     
     if not title or not content:
         return jsonify({'error': 'Title and content are required'}), 400
-        
-    # Points Logic
-    if is_urgent:
-        if current_user.points < bounty:
-             return jsonify({'error': 'Insufficient points for this bounty'}), 400
-        # Deduct points
-        current_user.points -= bounty
+    if bounty < 0:
+        return jsonify({'error': 'Invalid bounty'}), 400
         
     question = Question(
         title=title,
@@ -361,9 +405,97 @@ def create_question():
         bounty=bounty
     )
     db.session.add(question)
+    db.session.flush()
+
+    # Points Logic: escrow the bounty with one conditional UPDATE (no read-modify-write)
+    points_remaining = current_user.points
+    if bounty:
+        try:
+            points_remaining = points.debit(current_user.id, bounty, 'bounty', question.id)
+        except points.InsufficientPoints:
+            db.session.rollback()
+            return jsonify({'error': 'Insufficient points for this bounty'}), 400
+    record_question(question, current_user.display_name)
     db.session.commit()
     
-    return jsonify({'message': 'Question created successfully', 'id': question.id, 'points_remaining': current_user.points}), 201
+    return jsonify({'message': 'Question created successfully', 'id': question.id, 'points_remaining': points_remaining}), 201
+
+@api.route('/questions/<int:question_id>/accept', methods=['POST'])
+@login_required
+def accept_answer(question_id):
+    question = Question.query.get_or_404(question_id)
+    if question.user_id != current_user.id:
+        return jsonify({'error': 'Only the author can accept an answer'}), 403
+
+    data = request.get_json() or {}
+    reply_id = data.get('reply_id')
+    if not isinstance(reply_id, int) or isinstance(reply_id, bool):
+        return jsonify({'error': 'Invalid reply_id'}), 400
+    reply = db.session.get(Reply, reply_id)
+    if reply is None or reply.question_id != question.id:
+        return jsonify({'error': 'Reply not found for this question'}), 404
+    if reply.user_id == current_user.id:
+        return jsonify({'error': 'Cannot accept your own reply'}), 400
+
+    # Claim the question atomically so a bounty can only ever be paid once
+    claimed = Question.query.filter_by(id=question.id, accepted_reply_id=None).update(
+        {'accepted_reply_id': reply.id}, synchronize_session=False)
+    if not claimed:
+        return jsonify({'error': 'An answer has already been accepted'}), 409
+    if question.bounty:
+        points.credit(reply.user_id, question.bounty, 'bounty_award', question.id)
+    db.session.commit()
+    return jsonify({'message': 'Answer accepted', 'reply_id': reply.id, 'bounty_awarded': question.bounty or 0})
+
+@api.route('/leaderboard', methods=['GET'])
+@login_required
+def get_leaderboard():
+    role = request.args.get('role') or None
+    if role is not None and role not in LEADERBOARD_ROLES:
+        return jsonify({'error': 'Invalid role'}), 400
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), 100))
+        radius = max(0, min(int(request.args.get('around', 0)), 25))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+
+    # Ranks come from the in-memory index; SQL only fetches names for the rows shown
+    top = rank_index.top(limit, role)
+    around = rank_index.around(current_user.id, radius, role) if radius else []
+    me = rank_index.rank(current_user.id, role)
+    users = {u.id: u for u in with_profile(User.query, 'user_card').filter(
+        User.id.in_({user_id for _, user_id, _ in top + around})).all()}
+
+    def rows(entries):
+        return [{
+            'rank': rank,
+            'id': user_id,
+            'name': users[user_id].profile_info.full_name if users[user_id].profile_info and users[user_id].profile_info.full_name else users[user_id].username,
+            'role': users[user_id].role,
+            'points': points
+        } for rank, user_id, points in entries if user_id in users]
+
+    return jsonify({
+        'entries': rows(top),
+        'around_me': rows(around),
+        'me': {'rank': me[0], 'points': me[1], 'total': me[2]} if me else None
+    })
+
+@api.route('/points/history', methods=['GET'])
+@login_required
+def get_points_history():
+    try:
+        page = paginate(PointsTransaction.query.filter_by(user_id=current_user.id), POINTS_ORDER)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return page.response([{
+        'id': t.id,
+        'amount': t.amount,
+        'balance_after': t.balance_after,
+        'reason': t.reason,
+        'question_id': t.question_id,
+        'created_at': t.created_at.isoformat() if t.created_at else None
+    } for t in page.items])
 
 @api.route('/questions/<int:question_id>/reply', methods=['POST'])
 @login_required
@@ -387,7 +519,12 @@ def reply_question(question_id):
         user_id=current_user.id,
         question_id=question.id
     )
+    first_from_user = not Reply.query.filter_by(question_id=question.id, user_id=current_user.id).first()
     db.session.add(reply)
+    db.session.flush()
+    MentorStats.record_reply(reply, question, first_from_user)
+    Question.record_reply(reply)
+    record_answered(question.id)
     db.session.commit()
     
     return jsonify({'message': 'Reply added successfully'}), 201
@@ -399,48 +536,44 @@ def get_mentor_dashboard():
     if current_user.role not in ['mentor', 'alumni']:
         return jsonify({'error': 'Unauthorized'}), 403
 
-    user_name = current_user.profile_info.full_name if current_user.profile_info and current_user.profile_info.full_name else current_user.username
+    user_name = current_user.display_name
     
     
     # Stats - Real Counts
-    mentees_count = MentorshipRequest.query.filter_by(mentor_id=current_user.id, status='accepted').count()
+    stats = db.session.get(MentorStats, current_user.id) or MentorStats(
+        replies_given=0, questions_answered=0, first_answers=0, first_answer_seconds=0, accepted_mentorships=0)
+    mentees_count = stats.accepted_mentorships
     requests_count = MentorshipRequest.query.filter_by(mentor_id=current_user.id, status='pending').count()
     sessions_count = 0 # Placeholder as Session model doesn't exist yet
     
-    # Fetch questions that have NO replies (unanswered) AND are NOT urgent
-    # Using a left outer join to find questions with no replies
-    unanswered_questions = Question.query.outerjoin(Reply).filter(Reply.id == None, Question.is_urgent != True).order_by(Question.created_at.desc()).limit(5).all()
-    
+    # Unanswered queues come from the in-memory index (see question_queue.py)
     questions_data = []
-    for q in unanswered_questions:
-        author_name = q.author.profile_info.full_name if q.author.profile_info and q.author.profile_info.full_name else q.author.username
+    for q in question_queue.general(5):
+        author_name = q['author']
         questions_data.append({
-            'id': q.id,
-            'title': q.title,
-            'content': q.content if q.content else "",
+            'id': q['id'],
+            'title': q['title'],
+            'content': q['content'],
             'author': author_name if author_name else "Unknown",
             'author_initials': (author_name[:2].upper()) if author_name else "??",
-            'time': q.created_at.strftime("%Y-%m-%d")
+            'time': q['created_at'].strftime("%Y-%m-%d")
         })
 
-    # Fetch Urgent Questions (Unanswered) sorted by bounty
-    urgent_questions = Question.query.outerjoin(Reply).filter(Reply.id == None, Question.is_urgent == True).order_by(Question.bounty.desc(), Question.created_at.desc()).limit(5).all()
-    
     urgent_data = []
-    for q in urgent_questions:
-        author_name = q.author.profile_info.full_name if q.author.profile_info and q.author.profile_info.full_name else q.author.username
+    for q in question_queue.urgent(5):
+        author_name = q['author']
         urgent_data.append({
-            'id': q.id,
-            'title': q.title,
-            'content': q.content if q.content else "",
+            'id': q['id'],
+            'title': q['title'],
+            'content': q['content'],
             'author': author_name if author_name else "Unknown",
             'author_initials': (author_name[:2].upper()) if author_name else "??",
-            'time': q.created_at.strftime("%Y-%m-%d"),
-            'bounty': q.bounty
+            'time': q['created_at'].strftime("%Y-%m-%d"),
+            'bounty': q['bounty']
         })
 
     # Total Unanswered Count (Urgent + General)
-    total_unanswered_count = Question.query.outerjoin(Reply).filter(Reply.id == None).count()
+    total_unanswered_count = question_queue.count()
 
     return jsonify({
         'user_name': user_name,
@@ -448,7 +581,10 @@ def get_mentor_dashboard():
             'mentees': mentees_count,
             'requests': requests_count,
             'sessions': sessions_count,
-            'unanswered_questions': total_unanswered_count
+            'unanswered_questions': total_unanswered_count,
+            'replies_given': stats.replies_given,
+            'avg_response_hours': round(stats.avg_response_hours, 1) if stats.first_answers else None,
+            'trust_score': stats.trust_score
         },
         'questions': questions_data,
         'urgent_questions': urgent_data
@@ -462,24 +598,29 @@ def get_all_mentor_questions():
         return jsonify({'error': 'Unauthorized'}), 403
 
     # Fetch ALL questions
-    questions = Question.query.order_by(Question.created_at.desc()).all()
-    
-    questions_data = []
-    for q in questions:
-        author_name = q.author.profile_info.full_name if q.author.profile_info and q.author.profile_info.full_name else q.author.username
-        questions_data.append({
-            'id': q.id,
-            'title': q.title,
-            'content': q.content,
-            'author': author_name,
-            'author_initials': author_name[:2].upper() if author_name else "??",
-            'time': q.created_at.strftime("%Y-%m-%d"),
-            'is_urgent': q.is_urgent,
-            'bounty': q.bounty,
-            'is_answered': q.replies.count() > 0
-        })
+    try:
+        page = paginate(with_profile(Question.query, 'question_author'), RECENT_QUESTION_ORDER)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    return jsonify(questions_data)
+    def serialize(questions):
+        questions_data = []
+        for q in questions:
+            author_name = q.author.profile_info.full_name if q.author.profile_info and q.author.profile_info.full_name else q.author.username
+            questions_data.append({
+                'id': q.id,
+                'title': q.title,
+                'content': q.content,
+                'author': author_name,
+                'author_initials': author_name[:2].upper() if author_name else "??",
+                'time': q.created_at.strftime("%Y-%m-%d"),
+                'is_urgent': q.is_urgent,
+                'bounty': q.bounty,
+                'is_answered': bool(q.is_answered)
+            })
+        return questions_data
+
+    return page.stream(serialize)
 
 @api.route('/roadmaps', methods=['POST'])
 @login_required
@@ -503,6 +644,7 @@ def create_roadmap():
     )
     db.session.add(roadmap)
     db.session.commit()
+    invalidate('catalogue')
     
     return jsonify({'message': 'Roadmap created successfully', 'id': roadmap.id}), 201
 
@@ -548,7 +690,7 @@ def get_mentor_mentees():
         return jsonify({'error': 'Unauthorized'}), 403
         
     # Fetch accepted requests
-    accepted_requests = MentorshipRequest.query.filter_by(mentor_id=current_user.id, status='accepted').all()
+    accepted_requests = with_profile(MentorshipRequest.query, 'request_student').filter_by(mentor_id=current_user.id, status='accepted').all()
     
     mentees = []
     for req in accepted_requests:
@@ -568,7 +710,7 @@ def get_mentor_requests():
     if current_user.role not in ['mentor', 'alumni']:
         return jsonify({'error': 'Unauthorized'}), 403
         
-    pending_requests = MentorshipRequest.query.filter_by(mentor_id=current_user.id, status='pending').all()
+    pending_requests = with_profile(MentorshipRequest.query, 'request_student').filter_by(mentor_id=current_user.id, status='pending').all()
     
     requests_data = []
     for req in pending_requests:
@@ -609,6 +751,8 @@ def create_mentorship_request():
     db.session.add(access_req)
     db.session.commit()
     
+    publish(access_req.mentor_id, 'mentorship_request', {'id': access_req.id, 'status': access_req.status})
+    
     return jsonify({'message': 'Request sent successfully'}), 201
 
 @api.route('/mentorship/request/<int:req_id>/respond', methods=['POST'])
@@ -624,15 +768,24 @@ def respond_mentorship_request(req_id):
         
     data = request.get_json()
     action = data.get('action') # 'accept' or 'reject'
-    
-    if action == 'accept':
-        req_obj.status = 'accepted'
-    elif action == 'reject':
-        req_obj.status = 'rejected'
-    else:
+    status = {'accept': 'accepted', 'reject': 'rejected'}.get(action)
+    if status is None:
         return jsonify({'error': 'Invalid action'}), 400
-        
-    db.session.commit()
+
+    # Only move from the status we read, so concurrent responses can't count twice
+    previous = req_obj.status
+    if previous != status:
+        changed = MentorshipRequest.query.filter_by(id=req_obj.id, status=previous).update(
+            {'status': status}, synchronize_session=False)
+        if not changed:
+            db.session.rollback()
+            return jsonify({'error': 'Request was updated by another response'}), 409
+        if status == 'accepted':
+            MentorStats.record_mentorship(req_obj.mentor_id)
+        elif previous == 'accepted':
+            MentorStats.record_mentorship(req_obj.mentor_id, -1)
+        db.session.commit()
+    publish(req_obj.student_id, 'mentorship_request', {'id': req_obj.id, 'status': status})
     return jsonify({'message': f'Request {action}ed'})
 
 @api.route('/admin/users', methods=['GET'])
@@ -640,18 +793,21 @@ def respond_mentorship_request(req_id):
 def get_admin_users():
     if current_user.role != 'admin': return jsonify({'error': 'Unauthorized'}), 403
     
-    users = User.query.order_by(User.id.desc()).all()
-    users_data = []
-    for u in users:
-        users_data.append({
+    try:
+        page = paginate(User.query, USER_ORDER)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def serialize(users):
+        return [{
             'id': u.id,
             'username': u.username,
             'email': u.email,
             'role': u.role,
             'is_verified': u.is_verified,
             'joined': u.created_at.strftime("%Y-%m-%d") if hasattr(u, 'created_at') else 'N/A'
-        })
-    return jsonify(users_data)
+        } for u in users]
+    return page.stream(serialize)
 
 @api.route('/admin/verify_user/<int:user_id>', methods=['POST'])
 @login_required
@@ -677,19 +833,27 @@ def get_admin_content():
 
 @api.route('/messages/<int:partner_id>', methods=['GET'])
 @login_required
+@reads_primary # The read decides which messages get marked read
 def get_messages(partner_id):
     # Fetch conversation between current_user and partner_id
-    messages = Message.query.filter(
+    conversation = Message.query.filter(
         or_(
             (Message.sender_id == current_user.id) & (Message.recipient_id == partner_id),
             (Message.sender_id == partner_id) & (Message.recipient_id == current_user.id)
         )
-    ).order_by(Message.created_at.asc()).all()
-    
-    # Mark messages from partner as read
-    Message.query.filter_by(sender_id=partner_id, recipient_id=current_user.id, is_read=False).update({'is_read': True})
-    db.session.commit()
+    )
+    # Incremental sync: only messages newer than the last one the client has
+    after_id = request.args.get('after_id', type=int)
+    if after_id is not None:
+        conversation = conversation.filter(Message.id > after_id)
+    try:
+        page = paginate(conversation, MESSAGE_ORDER)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    messages = page.items
     
+    mark_conversation_read(partner_id)
+
     msgs_data = []
     for m in messages:
         msgs_data.append({
@@ -702,8 +866,33 @@ def get_messages(partner_id):
             'is_me': m.sender_id == current_user.id,
             'is_read': m.is_read
         })
-        
-    return jsonify(msgs_data)
+
+    return page.response(msgs_data)
+
+@api.route('/messages/<int:partner_id>/read', methods=['POST'])
+@login_required
+def mark_messages_read(partner_id):
+    # For messages pushed into an open chat, which no GET has marked read
+    mark_conversation_read(partner_id)
+    return jsonify({'unread_count': max(current_user.unread_messages or 0, 0)})
+
+def mark_conversation_read(partner_id):
+    """Mark messages from partner_id to the current user read, and commit.
+
+    The conversation summary lets us skip the UPDATE entirely when nothing is unread.
+    """
+    summary = Conversation.query.filter_by(user_id=current_user.id, partner_id=partner_id).first()
+    if summary is not None and not summary.unread_count:
+        return
+    marked = Message.query.filter_by(sender_id=partner_id, recipient_id=current_user.id, is_read=False).update({'is_read': True})
+    Conversation.mark_read(current_user.id, partner_id)
+    if marked:
+        User.query.filter_by(id=current_user.id).update({'unread_messages': User.unread_messages - marked})
+    # Commit even when nothing was marked: a drifted summary count is reset
+    db.session.commit()
+    if marked:
+        # Let the user's other tabs clear their unread badge
+        publish(current_user.id, 'unread_count', {'unread_count': max(current_user.unread_messages or 0, 0)})
 
 @api.route('/messages', methods=['POST'])
 @login_required
@@ -721,8 +910,24 @@ def send_message():
         content=content
     )
     db.session.add(msg)
+    db.session.flush()
+    Conversation.record_message(msg)
+    User.query.filter_by(id=msg.recipient_id).update({'unread_messages': User.unread_messages + 1}, synchronize_session=False)
     db.session.commit()
     
+    publish(msg.recipient_id, 'message', {
+        'id': msg.id,
+        'sender_id': msg.sender_id,
+        'recipient_id': msg.recipient_id,
+        'content': msg.content,
+        'timestamp': msg.created_at.isoformat(),
+        'date': msg.created_at.strftime("%Y-%m-%d"),
+        'is_me': False,
+        'is_read': False
+    })
+    unread = db.session.query(User.unread_messages).filter_by(id=msg.recipient_id).scalar()
+    publish(msg.recipient_id, 'unread_count', {'unread_count': max(unread or 0, 0)})
+    
     return jsonify({
         'message': 'Sent successfully',
         'data': {
@@ -732,8 +937,121 @@ def send_message():
             'is_me': True
         }
     }), 201
+
+@api.route('/conversations', methods=['GET'])
+@login_required
+def get_conversations():
+    # Inbox served from the per-user conversation summaries, not the message table
+    query = with_profile(Conversation.query, 'conversation_partner').filter_by(user_id=current_user.id)
+    try:
+        page = paginate(query, CONVERSATION_ORDER)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    conversations_data = []
+    for c in page.items:
+        partner = c.partner
+        name = partner.profile_info.full_name if partner.profile_info and partner.profile_info.full_name else partner.username
+        last = c.last_message
+        conversations_data.append({
+            'partner_id': partner.id,
+            'name': name,
+            'initials': name[:2].upper(),
+            'role': partner.role,
+            'last_message': {
+                'id': last.id,
+                'content': last.content,
+                'is_me': last.sender_id == current_user.id
+            } if last else None,
+            'timestamp': c.last_message_at.isoformat() if c.last_message_at else None,
+            'unread_count': c.unread_count
+        })
+    return page.response(conversations_data)
+
 @api.route('/messages/unread_count', methods=['GET'])
 @login_required
 def get_unread_count():
-    count = Message.query.filter_by(recipient_id=current_user.id, is_read=False).count()
-    return jsonify({'unread_count': count})
+    # Materialized on write; current_user is already loaded, so no extra query
+    return jsonify({'unread_count': max(current_user.unread_messages or 0, 0)})
+
+# ==========================================
+# Page bootstrap
+# ==========================================
+# Every page needs the header identity, the unread badge and usually one page
+# payload. /api/bootstrap?include=identity,unread,dashboard returns all the
+# requested sections from one request (one auth lookup, one DB session).
+# Page sections reuse the existing views, so the payloads stay identical.
+
+def _identity_section():
+    return {
+        'id': current_user.id,
+        'username': current_user.username,
+        'name': current_user.display_name,
+        'role': current_user.role,
+        'points': current_user.points,
+        'is_verified': current_user.is_verified
+    }
+
+@api.route('/me', methods=['GET'])
+@login_required
+def get_me():
+    # Identity comes from the token cache; unread_count is the one primary-key read
+    response = jsonify({**_identity_section(), 'unread_count': max(current_user.unread_messages or 0, 0)})
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
+
+BOOTSTRAP_SECTIONS = {
+    'identity': _identity_section,
+    'unread': lambda: {'unread_count': max(current_user.unread_messages or 0, 0)},
+    'profile': get_profile,
+    'dashboard': get_dashboard,
+    'mentor_dashboard': get_mentor_dashboard,
+    'conversations': get_conversations,
+}
+
+@api.route('/bootstrap', methods=['GET'])
+@login_required
+def get_bootstrap():
+    include = [s for s in request.args.get('include', 'identity').split(',') if s]
+    unknown = [s for s in include if s not in BOOTSTRAP_SECTIONS]
+    if unknown:
+        return jsonify({'error': f"Unknown section(s): {', '.join(unknown)}"}), 400
+
+    result = {}
+    for section in dict.fromkeys(include):
+        data = BOOTSTRAP_SECTIONS[section]()
+        if isinstance(data, dict):
+            result[section] = data
+            continue
+        # A view: unwrap its JSON, and report a per-section error instead of failing the page
+        response = make_response(data)
+        payload = response.get_json()
+        if response.status_code != 200:
+            payload = {'error': (payload or {}).get('error', 'Request failed'), 'status': response.status_code}
+        result[section] = payload
+    return jsonify(result)
+
+@api.route('/events/token', methods=['POST'])
+@login_required
+def get_stream_token():
+    # EventSource puts credentials in the URL; give it a token that expires
+    # quickly and opens nothing but the event stream
+    return jsonify({'stream_token': current_user.generate_stream_token(), 'expires_in': 60})
+
+@api.route('/events', methods=['GET'])
+@login_required
+def stream_events():
+    # Server-Sent Events: unread count now, then pushes from the write paths.
+    # Neither the handshake nor the stream queries the database.
+    unread = max(current_user.unread_messages or 0, 0)
+    try:
+        stream = broker.stream(current_user.id, initial=[('unread_count', {'unread_count': unread})])
+    except StreamLimitReached:
+        response = jsonify({'error': 'Too many open event streams, poll instead'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    return Response(stream, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
@@ -1,9 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_user, logout_user, login_required, current_user
 from models import User, db
+from hashing import hash_password, verify_password, needs_rehash, HashPoolSaturated, HashPoolUnavailable
 
 auth = Blueprint('auth', __name__, url_prefix='/auth')
 
+def _busy():
+    return jsonify({'error': 'Server busy, please retry shortly'}), 429, {'Retry-After': '1'}
+
+def _unavailable():
+    return jsonify({'error': 'Password service unavailable, please retry shortly'}), 503, {'Retry-After': '5'}
+
 @auth.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -22,7 +29,12 @@ def register():
         email=data['email'],
         role=data.get('role', 'student')
     )
-    user.set_password(data['password'])
+    try:
+        user.password_hash = hash_password(data['password'])
+    except HashPoolSaturated:
+        return _busy()
+    except HashPoolUnavailable:
+        return _unavailable()
     
     db.session.add(user)
     db.session.commit()
@@ -38,8 +50,22 @@ def login():
         
     user = User.query.filter_by(email=data['email']).first()
     
-    if user is None or not user.check_password(data['password']):
+    try:
+        valid = user is not None and verify_password(user.password_hash, data['password'])
+    except HashPoolSaturated:
+        return _busy()
+    except HashPoolUnavailable:
+        return _unavailable()
+    if not valid:
         return jsonify({'error': 'Invalid email or password'}), 401
+    
+    # Transparently upgrade hashes made with old parameters
+    if needs_rehash(user.password_hash):
+        try:
+            user.password_hash = hash_password(data['password'])
+            db.session.commit()
+        except (HashPoolSaturated, HashPoolUnavailable):
+            pass # Try again on a later login
         
     login_user(user)
     
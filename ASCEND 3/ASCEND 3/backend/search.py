@@ -0,0 +1,165 @@
+from html import escape
+from sqlalchemy import DDL, event, or_, text
+from models import db, Question, Reply, Roadmap, DiscussionThread
+
+# ==========================================
+# Full-text search
+# ==========================================
+# On SQLite, questions, replies, roadmaps and discussion threads are mirrored
+# into one FTS5 table and ranked with BM25. ORM insert/update/delete events
+# keep the mirror in the same transaction as the row itself. Other databases
+# fall back to ILIKE over the source tables. Titles and snippets are returned
+# HTML-escaped, with matches wrapped in <mark>.
+
+SEARCH_TABLE = 'search_index'
+# Control characters used as snippet() markers so they survive HTML escaping
+MARK_OPEN, MARK_CLOSE = '\x02', '\x03'
+
+CREATE_SEARCH_TABLE = DDL(f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        kind UNINDEXED, ref_id UNINDEXED, parent_id UNINDEXED, title, body,
+        tokenize = 'porter unicode61'
+    )
+""")
+
+# Mirror db.create_all() / db.drop_all(), which do not know about virtual tables
+event.listen(db.metadata, 'after_create', CREATE_SEARCH_TABLE.execute_if(dialect='sqlite'))
+event.listen(db.metadata, 'before_drop', DDL(f'DROP TABLE IF EXISTS {SEARCH_TABLE}').execute_if(dialect='sqlite'))
+
+KINDS = {
+    'question': Question,
+    'reply': Reply,
+    'roadmap': Roadmap,
+    'thread': DiscussionThread,
+}
+
+def _document(kind, obj):
+    """(parent_id, title, body) indexed for one row."""
+    if kind == 'question':
+        return None, obj.title, obj.content
+    if kind == 'reply':
+        return obj.question_id, '', obj.content
+    if kind == 'roadmap':
+        return None, obj.title, '\n'.join(filter(None, [obj.description, obj.steps]))
+    return None, obj.title, ''
+
+def _delete(connection, kind, ref_id):
+    connection.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE kind = :kind AND ref_id = :ref_id"),
+                       {'kind': kind, 'ref_id': ref_id})
+
+def _insert(connection, kind, obj):
+    parent_id, title, body = _document(kind, obj)
+    connection.execute(text(
+        f"INSERT INTO {SEARCH_TABLE} (kind, ref_id, parent_id, title, body) "
+        "VALUES (:kind, :ref_id, :parent_id, :title, :body)"
+    ), {'kind': kind, 'ref_id': obj.id, 'parent_id': parent_id, 'title': title or '', 'body': body or ''})
+
+def _register_sync(kind, model):
+    def after_insert(mapper, connection, target):
+        if connection.dialect.name == 'sqlite':
+            _insert(connection, kind, target)
+
+    def after_update(mapper, connection, target):
+        if connection.dialect.name == 'sqlite':
+            _delete(connection, kind, target.id)
+            _insert(connection, kind, target)
+
+    def after_delete(mapper, connection, target):
+        if connection.dialect.name == 'sqlite':
+            _delete(connection, kind, target.id)
+
+    event.listen(model, 'after_insert', after_insert)
+    event.listen(model, 'after_update', after_update)
+    event.listen(model, 'after_delete', after_delete)
+
+for _kind, _model in KINDS.items():
+    _register_sync(_kind, _model)
+
+def rebuild_index():
+    """Repopulate the FTS table from the source tables (SQLite only)."""
+    connection = db.session.connection()
+    connection.execute(CREATE_SEARCH_TABLE)
+    connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    count = 0
+    for kind, model in KINDS.items():
+        for obj in model.query.yield_per(500):
+            _insert(connection, kind, obj)
+            count += 1
+    db.session.commit()
+    return count
+
+def _match_expression(query):
+    """Quote each term so user input can never be FTS5 syntax; prefix-match the last."""
+    terms = [t.replace('"', '""') for t in query.split()]
+    if not terms:
+        return None
+    quoted = ['"%s"' % t for t in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+def _fts_search(query, kinds, limit, offset):
+    expression = _match_expression(query)
+    if expression is None:
+        return []
+    kind_params = {f'k{i}': k for i, k in enumerate(kinds)}
+    rows = db.session.execute(text(f"""
+        SELECT kind, ref_id, parent_id, title,
+               snippet({SEARCH_TABLE}, -1, :mark_open, :mark_close, '…', 16) AS snippet,
+               bm25({SEARCH_TABLE}, 0, 0, 0, 10.0, 1.0) AS score
+        FROM {SEARCH_TABLE}
+        WHERE {SEARCH_TABLE} MATCH :expression
+          AND kind IN ({', '.join(':' + k for k in kind_params)})
+        ORDER BY score, rowid
+        LIMIT :limit OFFSET :offset
+    """), {'expression': expression, 'limit': limit, 'offset': offset,
+          'mark_open': MARK_OPEN, 'mark_close': MARK_CLOSE, **kind_params}).fetchall()
+    return [{
+        'type': r.kind,
+        'id': r.ref_id,
+        'question_id': r.parent_id if r.kind == 'reply' else None,
+        'title': escape(r.title),
+        'snippet': escape(r.snippet).replace(MARK_OPEN, '<mark>').replace(MARK_CLOSE, '</mark>'),
+        'score': -r.score # bm25() is lower-is-better
+    } for r in rows]
+
+def _like_snippet(text_value, query, width=60):
+    text_value = text_value or ''
+    index = text_value.lower().find(query.lower())
+    if index < 0:
+        return text_value[:width * 2]
+    start = max(0, index - width)
+    return ('…' if start else '') + text_value[start:index + len(query) + width]
+
+def _like_search(query, kinds, limit, offset):
+    # % and _ in the query are literal characters, not wildcards
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    pattern = f'%{escaped}%'
+    fields = {
+        'question': ([Question.title], [Question.content]),
+        'reply': ([], [Reply.content]),
+        'roadmap': ([Roadmap.title], [Roadmap.description, Roadmap.steps]),
+        'thread': ([DiscussionThread.title], []),
+    }
+    hits = []
+    for kind in kinds:
+        model = KINDS[kind]
+        title_cols, body_cols = fields[kind]
+        matches = model.query.filter(or_(*[c.ilike(pattern, escape='\\') for c in title_cols + body_cols])).limit(offset + limit).all()
+        for obj in matches:
+            parent_id, title, body = _document(kind, obj)
+            in_title = query.lower() in (title or '').lower()
+            hits.append({
+                'type': kind,
+                'id': obj.id,
+                'question_id': parent_id if kind == 'reply' else None,
+                'title': escape(title or ''),
+                'snippet': escape(_like_snippet(title if in_title else body, query)),
+                'score': 2.0 if in_title else 1.0
+            })
+    hits.sort(key=lambda h: (-h['score'], -h['id']))
+    return hits[offset:offset + limit]
+
+def search(query, kinds, limit, offset):
+    if db.engine.dialect.name == 'sqlite':
+        return _fts_search(query, kinds, limit, offset)
+    return _like_search(query, kinds, limit, offset)
@@ -1,5 +1,5 @@
 from app import app, db
-from models import User, ProfileInfo, Skill, Company, Experience, Question, DiscussionThread, Reply, CareerPath, Roadmap, MentorshipRequest
+from models import User, ProfileInfo, Skill, Company, Experience, Question, DiscussionThread, Reply, CareerPath, Roadmap, MentorshipRequest, MentorStats
 from datetime import date
 
 def seed_data():
@@ -161,6 +161,8 @@ def seed_data():
                  print("Adding reply...")
                  r1 = Reply(content="You should look into eager loading with joinedload options.", user_id=mentor.id, question_id=q1.id)
                  db.session.add(r1)
+                 db.session.flush()
+                 Question.record_reply(r1)
                  db.session.commit()
 
         # Create Career Paths
@@ -234,6 +236,7 @@ def seed_data():
                 db.session.add(req2)
 
         db.session.commit()
+        MentorStats.rebuild()
         print("Database verification/seeding complete!")
 
 if __name__ == "__main__":
@@ -0,0 +1,172 @@
+from operator import attrgetter
+from flask import request
+from sqlalchemy.orm import load_only
+from models import User, Question, Reply
+
+# ==========================================
+# Serializers
+# ==========================================
+# A Schema lists every field a model can be rendered with: how to read it, the
+# model columns it needs and which batch loaders it depends on. An endpoint
+# exposes a View of a schema (its default fields plus optional extras), and
+# clients narrow or widen the output with ?fields=a,b and ?expand=c. For each
+# distinct field set the getters are resolved once and cached, so rendering a
+# row is a single pass over precomputed (name, getter) pairs. Fields are
+# rendered in the view's order whatever order they were asked for in, so
+# reordering a query string does not make a new cache entry. The selection
+# also tells the endpoint which columns to load and which loaders to skip.
+
+SELECTION_CACHE_SIZE = 64 # Compiled field sets kept per view
+
+class Field:
+    """`get` is an attribute name or a callable (obj, ctx) -> value.
+
+    `columns` are the model columns the value is computed from (attribute
+    fields default to their own name); `needs` names the batch loaders
+    (author, replies, experience, ...) the endpoint must run for it.
+    """
+    def __init__(self, get, columns=None, needs=()):
+        if isinstance(get, str):
+            read = attrgetter(get)
+            self.get = lambda obj, ctx: read(obj)
+            self.columns = (get,) if columns is None else columns
+        else:
+            self.get = get
+            self.columns = columns or ()
+        self.needs = needs
+
+class Schema:
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+
+    def view(self, default, optional=()):
+        return View(self, default, optional)
+
+class View:
+    def __init__(self, schema, default, optional=()):
+        self.schema = schema
+        self.default = tuple(default)
+        self.allowed = set(default) | set(optional)
+        self._order = {name: i for i, name in enumerate(dict.fromkeys(self.default + tuple(optional)))}
+        self._selections = {} # names in view order -> Selection
+
+    def select(self):
+        """Parse ?fields= and ?expand= into a Selection; ValueError on unknown names."""
+        fields = request.args.get('fields')
+        names = [n for n in fields.split(',') if n] if fields is not None else list(self.default)
+        names += [n for n in request.args.get('expand', '').split(',') if n]
+        unknown = sorted(set(names) - self.allowed)
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        return self.compile(names)
+
+    def compile(self, names):
+        names = tuple(sorted(set(names), key=self._order.__getitem__))
+        selection = self._selections.get(names)
+        if selection is None:
+            if len(self._selections) >= SELECTION_CACHE_SIZE:
+                self._selections.clear()
+            selection = self._selections[names] = Selection(self.schema, names)
+        return selection
+
+class Selection:
+    def __init__(self, schema, names):
+        fields = [schema.fields[name] for name in names]
+        self.model = schema.model
+        self.names = names
+        self._getters = tuple((name, field.get) for name, field in zip(names, fields))
+        self._columns = tuple(dict.fromkeys(c for field in fields for c in field.columns))
+        self._needs = frozenset(n for field in fields for n in field.needs)
+
+    def needs(self, loader):
+        return loader in self._needs
+
+    def load_only(self, *always):
+        """Loader option restricting the SELECT to the selected fields' columns.
+
+        `always` adds columns the endpoint itself uses (sort keys, filters).
+        """
+        columns = [getattr(self.model, c) for c in self._columns]
+        return load_only(*dict.fromkeys(columns + list(always)))
+
+    def dump(self, obj, ctx=None):
+        return {name: get(obj, ctx) for name, get in self._getters}
+
+    def dump_all(self, objs, ctx=None):
+        getters = self._getters
+        return [{name: get(obj, ctx) for name, get in getters} for obj in objs]
+
+# ==========================================
+# Schemas
+# ==========================================
+
+def _date(column):
+    read = attrgetter(column)
+    return Field(lambda obj, ctx: read(obj).strftime("%Y-%m-%d"), columns=(column,))
+
+REPLY = Schema(Reply, {
+    'id': Field('id'),
+    'content': Field('content'),
+    'author_name': Field(lambda r, ctx: r.author.display_name, columns=('user_id',), needs=('author',)),
+    'author_role': Field(lambda r, ctx: r.author.role, columns=('user_id',), needs=('author',)),
+    'created_at': _date('created_at'),
+})
+# Nested under each question; not client-selectable
+REPLY_ITEM = Selection(REPLY, ('id', 'content', 'author_name', 'author_role', 'created_at'))
+
+QUESTION = Schema(Question, {
+    'id': Field('id'),
+    'title': Field('title'),
+    'content': Field('content'),
+    'is_urgent': Field('is_urgent'),
+    'bounty': Field('bounty'),
+    'author_name': Field(lambda q, ctx: q.author.display_name, columns=('user_id',), needs=('author',)),
+    'author_initials': Field(lambda q, ctx: q.author.username[:2].upper(), columns=('user_id',), needs=('author',)),
+    'created_at': _date('created_at'),
+    'accepted_reply_id': Field('accepted_reply_id'),
+    'replies': Field(lambda q, ctx: REPLY_ITEM.dump_all(ctx['replies'].get(q.id, [])), columns=('id',), needs=('replies',)),
+    'reply_count': Field(lambda q, ctx: q.reply_count or 0, columns=('reply_count',)),
+    'is_answered': Field(lambda q, ctx: bool(q.is_answered), columns=('is_answered',)),
+})
+QUESTION_LIST = QUESTION.view(
+    ('id', 'title', 'content', 'is_urgent', 'bounty', 'author_name', 'author_initials', 'created_at', 'accepted_reply_id', 'replies'),
+    optional=('reply_count', 'is_answered'))
+
+def _experience(m, ctx):
+    return ctx['experience'].get(m.id)
+
+def _job_role(m, ctx):
+    exp = _experience(m, ctx)
+    return exp.role if exp else "Mentor"
+
+def _company(m, ctx):
+    exp = _experience(m, ctx)
+    return exp.company.name if exp and exp.company else "Unknown"
+
+def _stat(name, default=0):
+    return Field(lambda m, ctx: getattr(m.mentor_stats, name) if m.mentor_stats else default, columns=('id',), needs=('stats',))
+
+MENTOR_CARD = Schema(User, {
+    'id': Field('id'),
+    'name': Field(lambda m, ctx: m.display_name, columns=('username',)),
+    'role': Field(_job_role, columns=('id',), needs=('experience',)),
+    'company': Field(_company, columns=('id',), needs=('experience',)),
+    'bio': Field(lambda m, ctx: m.profile_info.bio if m.profile_info else "No bio available.", columns=('id',)),
+    'initials': Field(lambda m, ctx: m.display_name[:2].upper(), columns=('username',)),
+    'trust_score': _stat('trust_score'),
+    'replies_given': _stat('replies_given'),
+    'avg_response_hours': Field(
+        lambda m, ctx: round(m.mentor_stats.avg_response_hours, 1) if m.mentor_stats and m.mentor_stats.first_answers else None,
+        columns=('id',), needs=('stats',)),
+    'connection_status': Field(lambda m, ctx: ctx['status'].get(m.id, 'none'), columns=('id',), needs=('status',)),
+    'match_score': Field(lambda m, ctx: round(ctx['match'][m.id] * 100), columns=('id',)),
+})
+MENTOR_LIST = MENTOR_CARD.view(
+    ('id', 'name', 'role', 'company', 'bio', 'initials', 'trust_score', 'connection_status'),
+    optional=('replies_given', 'avg_response_hours'))
+CONNECTED_MENTORS = MENTOR_CARD.view(
+    ('id', 'name', 'role', 'company', 'bio', 'initials'),
+    optional=('trust_score', 'replies_given', 'avg_response_hours'))
+# Dashboard recommendations; the dashboard payload has no field selection
+RECOMMENDED_MENTOR = Selection(MENTOR_CARD, ('id', 'name', 'role', 'company', 'match_score', 'trust_score'))
@@ -0,0 +1,115 @@
+import re
+import sqlite3
+import threading
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+# ==========================================
+# SQLite production profile
+# ==========================================
+# Every new SQLite connection is switched to WAL (readers no longer wait for
+# the writer and vice versa) with synchronous=NORMAL, a memory-mapped read
+# path, a larger page cache and a busy timeout, so a briefly locked database
+# makes a writer wait instead of failing with "database is locked".
+#
+# SQLite only ever has one writer. With SQLITE_SINGLE_WRITER the writers of
+# this process queue on a lock, taken at a transaction's first write statement
+# and released at commit/rollback, instead of spinning in SQLite's busy handler
+# against each other; the busy timeout still arbitrates between processes. A
+# transaction that timed out waiting for the lock leaves the rest of its
+# writes to SQLite rather than waiting out the timeout again on each one.
+# Reads never take the lock. Under WAL with synchronous=NORMAL a commit does
+# not fsync, so small commits are already cheap and are not batched further.
+#
+# init_app must run before db.init_app: the pool is sized when the engine is
+# created.
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'DROP', 'ALTER')
+CTE_WRITE = re.compile(r'\b(?:INSERT|UPDATE|DELETE|REPLACE)\b', re.IGNORECASE)
+
+_settings = {}
+_writer = threading.Lock()
+
+def _is_file_database(uri):
+    return uri.startswith('sqlite') and ':memory:' not in uri and uri.rstrip('/') not in ('sqlite:', 'sqlite://')
+
+def _apply_pragmas(dbapi_connection, connection_record):
+    if not _settings or not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {_settings['busy_timeout']}")
+        if _settings['journal_mode']:
+            cursor.execute(f"PRAGMA journal_mode = {_settings['journal_mode']}")
+        cursor.execute(f"PRAGMA synchronous = {_settings['synchronous']}")
+        cursor.execute(f"PRAGMA mmap_size = {_settings['mmap_size']}")
+        cursor.execute(f"PRAGMA cache_size = {_settings['cache_size']}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+    finally:
+        cursor.close()
+
+def _is_write(statement):
+    first = statement.lstrip().split(None, 1)[0].upper()
+    if first == 'WITH':
+        # WITH ... INSERT/UPDATE/DELETE; a false positive only takes the lock
+        return CTE_WRITE.search(statement) is not None
+    return first in WRITE_STATEMENTS
+
+def _take_writer(conn, cursor, statement, parameters, context, executemany):
+    if not _settings.get('single_writer') or conn.dialect.name != 'sqlite':
+        return
+    if conn.info.get('holds_writer') or conn.info.get('writer_timed_out') or not _is_write(statement):
+        return
+    # Bounded wait: past the busy timeout, fall through to SQLite's own locking
+    if _writer.acquire(timeout=_settings['busy_timeout'] / 1000):
+        conn.info['holds_writer'] = True
+    else:
+        conn.info['writer_timed_out'] = True # Until this transaction ends
+
+def _release_writer(info):
+    info.pop('writer_timed_out', None)
+    if info.pop('holds_writer', False):
+        _writer.release()
+
+def _end_transaction(conn):
+    _release_writer(conn.info)
+
+def _checkin(dbapi_connection, connection_record):
+    # A connection returned mid-transaction is rolled back by the pool
+    _release_writer(connection_record.info)
+
+def init_app(app):
+    app.config.setdefault('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config.setdefault('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config.setdefault('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)
+    app.config.setdefault('SQLITE_CACHE_SIZE', -64 * 1024)
+    app.config.setdefault('SQLITE_BUSY_TIMEOUT', 5000)
+    app.config.setdefault('SQLITE_SINGLE_WRITER', True)
+    app.config.setdefault('SQLITE_POOL_SIZE', 10)
+    app.config.setdefault('SQLITE_POOL_OVERFLOW', 20)
+
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if not _is_file_database(uri):
+        return
+
+    # Many concurrent readers, each on its own pooled connection
+    options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    options.setdefault('pool_size', app.config['SQLITE_POOL_SIZE'])
+    options.setdefault('max_overflow', app.config['SQLITE_POOL_OVERFLOW'])
+    options.setdefault('connect_args', {}).setdefault('timeout', app.config['SQLITE_BUSY_TIMEOUT'] / 1000)
+
+    _settings.update(
+        journal_mode=app.config['SQLITE_JOURNAL_MODE'],
+        synchronous=app.config['SQLITE_SYNCHRONOUS'],
+        mmap_size=int(app.config['SQLITE_MMAP_SIZE']),
+        cache_size=int(app.config['SQLITE_CACHE_SIZE']),
+        busy_timeout=int(app.config['SQLITE_BUSY_TIMEOUT']),
+        single_writer=bool(app.config['SQLITE_SINGLE_WRITER'])
+    )
+    if not event.contains(Pool, 'connect', _apply_pragmas):
+        event.listen(Pool, 'connect', _apply_pragmas)
+        event.listen(Pool, 'checkin', _checkin)
+        event.listen(Engine, 'before_cursor_execute', _take_writer)
+        event.listen(Engine, 'commit', _end_transaction)
+        event.listen(Engine, 'rollback', _end_transaction)
@@ -0,0 +1,53 @@
+import sys
+import os
+import base64
+import json
+
+# Add current directory to path so we can import app
+sys.path.append(os.getcwd())
+
+from app import app
+from models import User
+
+# Cursors are client input: anything that does not decode to what the
+# endpoint issued must be rejected with a 400, never a 500.
+def _cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+MALFORMED_CURSORS = {
+    'not base64': '%%%',
+    'not JSON': base64.urlsafe_b64encode(b'not json').decode(),
+    'object': _cursor({'a': 1}),
+    'empty list': _cursor([]),
+    'string value': _cursor(['10']),
+    'nested value': _cursor([[1]]),
+}
+ENDPOINTS = ('/api/search?q=python', '/api/questions', '/api/discussions')
+
+def verify_cursors():
+    failures = 0
+    with app.app_context():
+        print("--- Malformed Cursor Verification ---")
+        user = User.query.filter_by(role='student').first()
+        if not user:
+            print("SKIP: No student user found in database.")
+            return 0
+        token = user.generate_auth_token()
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    for endpoint in ENDPOINTS:
+        separator = '&' if '?' in endpoint else '?'
+        for name, cursor in MALFORMED_CURSORS.items():
+            response = client.get(f'{endpoint}{separator}cursor={cursor}', headers=headers)
+            response.get_data()
+            status = "PASS" if response.status_code == 400 else "FAIL"
+            if status == "FAIL":
+                failures += 1
+            print(f"{status} {endpoint} with {name} cursor: HTTP {response.status_code}")
+
+    print(f"\n{failures} failure(s)")
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if verify_cursors() else 0)
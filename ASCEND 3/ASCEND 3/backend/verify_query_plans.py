@@ -0,0 +1,117 @@
+import sys
+import os
+import re
+from sqlalchemy import event
+
+# Add current directory to path so we can import app
+sys.path.append(os.getcwd())
+
+from app import app, db
+from models import User
+
+# Endpoints whose SQL must be served from indexes, per role
+ENDPOINTS = {
+    'student': [
+        '/api/dashboard',
+        '/api/questions',
+        '/api/mentors',
+        '/api/student/mentors',
+        '/api/student/questions',
+        '/api/student/responses',
+        '/api/discussions',
+        '/api/messages/unread_count',
+        '/api/messages/{mentor_id}',
+        '/api/conversations',
+        '/api/points/history',
+        '/api/leaderboard?around=2',
+    ],
+    'mentor': [
+        '/api/mentor/dashboard',
+        '/api/mentor/questions',
+        '/api/mentor/mentees',
+        '/api/mentor/requests',
+    ],
+    'admin': [
+        '/api/admin/users',
+    ],
+}
+
+# Whole-table reads by design: lazy in-memory index builds and unpaginated
+# full listings. Any other full scan on these endpoints still fails.
+EXPECTED_SCANS = {
+    '/api/dashboard': {'replies'}, # Mentor recommendation matrix build (recommendations.py)
+    '/api/leaderboard?around=2': {'users'}, # Rank index build (leaderboard.py)
+    '/api/admin/users': {'users'}, # Unpaginated listing of every user
+}
+
+# "SCAN <table>" (older SQLite: "SCAN TABLE <table>", either with "AS <alias>")
+# without "USING [COVERING] INDEX" is a full table scan
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+PLANNED_STATEMENTS = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+def full_scans(connection, statement, parameters):
+    """Return the tables a statement reads with a full scan."""
+    if not statement.lstrip().upper().startswith(PLANNED_STATEMENTS):
+        return []
+    plan = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+    tables = []
+    for row in plan:
+        match = FULL_SCAN.match(row[-1])
+        if match:
+            tables.append(match.group(1))
+    return tables
+
+def verify_query_plans():
+    failures = 0
+    statements = []
+    tokens = {}
+    with app.app_context():
+        print("--- Query Plan Verification ---")
+        if db.engine.dialect.name != 'sqlite':
+            print("SKIP: EXPLAIN QUERY PLAN checks only run against SQLite.")
+            return 0
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, parameters, context, executemany: statements.append((statement, parameters)))
+        for role in ENDPOINTS:
+            user = User.query.filter_by(role=role).first()
+            if user:
+                tokens[role] = user.generate_auth_token()
+        mentor = User.query.filter_by(role='mentor').first()
+        mentor_id = mentor.id if mentor else 0
+
+    for role, urls in ENDPOINTS.items():
+        if role not in tokens:
+            print(f"SKIP: No {role} user found in database.")
+            continue
+        # Fresh client per role so no session cookie leaks between users
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {tokens[role]}'}
+
+        for url in urls:
+            url = url.format(mentor_id=mentor_id)
+            del statements[:]
+            response = client.get(url, headers=headers)
+            response.get_data() # Streamed endpoints query while the body is read
+            captured = list(statements)
+
+            with app.app_context():
+                with db.engine.connect() as connection:
+                    scans = []
+                    for statement, parameters in captured:
+                        for table in full_scans(connection, statement, parameters):
+                            if table not in EXPECTED_SCANS.get(url, ()):
+                                scans.append((table, statement))
+
+            if response.status_code != 200 or scans:
+                failures += 1
+                print(f"FAIL {url} ({role}): HTTP {response.status_code}")
+                for table, statement in scans:
+                    print(f"    full scan of {table}: {' '.join(statement.split())[:160]}")
+            else:
+                print(f"PASS {url} ({role}): {len(captured)} statements, no full scans")
+
+    print(f"\n{failures} failure(s)")
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if verify_query_plans() else 0)